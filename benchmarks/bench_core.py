@@ -0,0 +1,315 @@
+"""
+Core Pipeline Benchmarks
+File: benchmarks/bench_core.py
+
+Usage:
+    python -m benchmarks.bench_core --output results.json
+    python -m benchmarks.bench_core --baseline results.json --threshold 0.25
+"""
+
+from typing import Callable, Dict, List
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from core.agent import AgenticSystem
+from core.execution import Executor
+from core.learning import LearningModule
+from core.planning import Plan, Planner, Step
+from core.task_understanding import TaskUnderstanding
+from tools.cache import ResultCache
+from tools.calculator import CalculatorTool
+from tools.file_operations import FileOperationTool
+from tools.manager import ToolManager
+from tools.text_analysis import TextAnalysisTool
+from config.settings import settings
+from utils.log import ROOT_LOGGER, setup_logging
+
+
+SIZES = {
+    "full": {
+        "history": [100, 1000, 10000],
+        "steps": [10, 100, 1000],
+        "task_words": [10, 100, 1000],
+        "text_kb": [1, 64, 1024]
+    },
+    "quick": {
+        "history": [100, 1000],
+        "steps": [10, 100],
+        "task_words": [10, 100],
+        "text_kb": [1, 64]
+    }
+}
+
+WORDS = "calculate analyze the file text sum average count words in report data".split()
+
+
+def measure(fn: Callable[[], object], number: int = 1, repeat: int = 5) -> float:
+    """Median detik per operasi dari beberapa putaran"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return statistics.median(timings)
+
+
+def sample_record(index: int) -> tuple:
+    plan = {
+        "task": f"Calculate {index} + 1",
+        "steps": [{"step_id": 1, "description": "Execute calculator", "tool": "calculator",
+                   "dependencies": [], "status": "completed"}],
+        "status": "completed"
+    }
+    result = {"plan_status": "completed", "completed_steps": 1, "total_steps": 1}
+    return plan, result
+
+
+def build_plan(steps: int, fan_out: bool) -> Plan:
+    """Plan rantai (1 -> 2 -> ...) atau fan-out (1 -> semua step lain)"""
+    plan = Plan("benchmark")
+    plan.add_step(Step(1, "root"))
+    for step_id in range(2, steps + 1):
+        dependency = 1 if fan_out else step_id - 1
+        plan.add_step(Step(step_id, f"step {step_id}", dependencies=[dependency]))
+    return plan
+
+
+# Task -> argumen tool. Pipeline rule-based tidak mengekstrak argumen dari
+# teks task (itu tugas LLM), jadi BenchPlanner mengisinya supaya tool benar-
+# benar dijalankan, bukan berhenti di "Invalid input parameters".
+PROCESS_TASKS = {
+    "Calculate 25 + 37": {"calculator": {"operation": "add", "a": 25, "b": 37}},
+    "Analyze the text and count words": {
+        "text_analysis": {"text": "The quick brown fox jumps over the lazy dog. " * 20,
+                          "detailed": True}
+    },
+    "Read the file and count words": {"file_operation": {"operation": "read", "path": None}}
+}
+
+
+class BenchPlanner(Planner):
+    """Planner yang mengisi params step dari PROCESS_TASKS"""
+    
+    def __init__(self, arguments: Dict[str, Dict[str, Dict]], **kwargs):
+        super().__init__(**kwargs)
+        self.arguments = arguments
+    
+    def create_plan(self, task: str, analysis: Dict) -> Plan:
+        plan = super().create_plan(task, analysis)
+        for step in plan.steps:
+            if step.tool:
+                step.params = self.arguments[task].get(step.tool)
+        return plan
+
+
+def bench_process_task(sizes: Dict) -> Dict[str, float]:
+    saved = (settings.DATA_DIR, settings.CACHE_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        # History spill, cache dan learning log tidak menyentuh direktori repo
+        settings.DATA_DIR = settings.CACHE_DIR = Path(tmp)
+        try:
+            per_task = _bench_agent(tmp)
+        finally:
+            settings.DATA_DIR, settings.CACHE_DIR = saved
+    
+    return {"process_task": per_task}
+
+
+def _bench_agent(tmp: str) -> float:
+    path = Path(tmp) / "report.txt"
+    path.write_text("calculate the average of the report data\n" * 100, encoding="utf-8")
+    arguments = {task: {tool: dict(params) for tool, params in tools.items()}
+                 for task, tools in PROCESS_TASKS.items()}
+    arguments["Read the file and count words"]["file_operation"]["path"] = str(path)
+    
+    agent = AgenticSystem(learning=LearningModule(storage_path=tmp))
+    try:
+        agent.register_tool(CalculatorTool())
+        agent.register_tool(FileOperationTool(allowed_dirs=[tmp]))
+        agent.register_tool(TextAnalysisTool())
+        
+        agent.planner.close()
+        agent.planner = BenchPlanner(arguments, cost_model=agent.cost_model)
+        # Tanpa cache: setiap putaran mengukur analisis, planning dan eksekusi tool
+        agent.task_understanding.cache = ResultCache(max_size=0)
+        for tool in agent.tool_manager.tools.values():
+            tool.cache = None
+        
+        for task in arguments:
+            response = agent.process_task(task)
+            failed = [step for step in response["execution_result"]["results"]
+                      if not (step.get("result") or {}).get("success")]
+            if response["status"] != "completed" or failed or not response["execution_result"]["results"]:
+                raise RuntimeError(f"benchmark task did not run its tools: {task!r}")
+        
+        return measure(lambda: [agent.process_task(task) for task in arguments],
+                       number=20) / len(arguments)
+    finally:
+        agent.close()
+
+
+def bench_learning(sizes: Dict) -> Dict[str, float]:
+    results = {}
+    for size in sizes["history"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            learning = LearningModule(storage_path=tmp)
+            records = [sample_record(i) for i in range(size)]
+            
+            start = time.perf_counter()
+            for plan, result in records:
+                learning.record_execution(plan, result)
+            learning.flush()
+            results[f"learning.record_execution[{size}]"] = (time.perf_counter() - start) / size
+            learning.close()
+            
+            def load():
+                module = LearningModule(storage_path=tmp)
+                module.load_from_disk()
+                module.close()
+            
+            results[f"learning.load_from_disk[{size}]"] = measure(load, repeat=3)
+    return results
+
+
+def bench_planning(sizes: Dict) -> Dict[str, float]:
+    results = {}
+    executor = Executor(ToolManager(), max_workers=1)
+    
+    for steps in sizes["steps"]:
+        for shape, fan_out in (("chain", False), ("fanout", True)):
+            def drain():
+                plan = build_plan(steps, fan_out)
+                plan.validate()
+                while True:
+                    ready = plan.get_next_steps()
+                    if not ready:
+                        break
+                    for step in ready:
+                        step.status = "completed"
+            
+            results[f"plan.get_next_steps[{shape},{steps}]"] = measure(drain, repeat=3)
+            results[f"executor.execute_plan[{shape},{steps}]"] = measure(
+                lambda: executor.execute_plan(build_plan(steps, fan_out)), repeat=3
+            )
+    executor.shutdown()
+    return results
+
+
+def bench_analyze(sizes: Dict) -> Dict[str, float]:
+    results = {}
+    for words in sizes["task_words"]:
+        task = " ".join(WORDS[i % len(WORDS)] for i in range(words))
+        # Cache dilewati supaya yang diukur adalah analisis sebenarnya
+        understanding = TaskUnderstanding(tool_manager=ToolManager())
+        results[f"task_understanding.analyze[{words}w]"] = measure(
+            lambda: understanding._analyze(task), number=20
+        )
+    return results
+
+
+def bench_text_analysis(sizes: Dict) -> Dict[str, float]:
+    results = {}
+    tool = TextAnalysisTool()
+    for kb in sizes["text_kb"]:
+        text = ("The quick brown fox jumps over the lazy dog. " * (kb * 24))[:kb * 1024]
+        results[f"text_analysis[{kb}KB]"] = measure(
+            lambda: tool.execute(text=text, detailed=True), repeat=3
+        )
+    return results
+
+
+BENCHMARKS: Dict[str, Callable[[Dict], Dict[str, float]]] = {
+    "process_task": bench_process_task,
+    "learning": bench_learning,
+    "planning": bench_planning,
+    "analyze": bench_analyze,
+    "text_analysis": bench_text_analysis
+}
+
+
+def run(names: List[str] = None, quick: bool = False) -> Dict:
+    sizes = SIZES["quick" if quick else "full"]
+    results = {}
+    for name in names or BENCHMARKS:
+        print(f"▶ {name}", file=sys.stderr)
+        results.update(BENCHMARKS[name](sizes))
+    
+    return {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": results
+    }
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float],
+            threshold: float) -> List[Dict]:
+    """Case yang lebih lambat dari baseline * (1 + threshold)"""
+    regressions = []
+    for case, seconds in current.items():
+        previous = baseline.get(case)
+        if previous and seconds > previous * (1 + threshold):
+            regressions.append({
+                "case": case,
+                "baseline": previous,
+                "current": seconds,
+                "ratio": seconds / previous
+            })
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the core agent pipeline")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="run only the given benchmark (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="smaller input sizes")
+    args = parser.parse_args(argv)
+    
+    # Log pipeline tidak ikut diukur
+    setup_logging()
+    root = logging.getLogger(ROOT_LOGGER)
+    level = root.level
+    root.setLevel(logging.WARNING)
+    try:
+        report = run(args.only, quick=args.quick)
+    finally:
+        root.setLevel(level)
+    
+    for case, seconds in report["results"].items():
+        print(f"{case:<48} {seconds * 1e6:>14.1f} µs")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        report["regressions"] = regressions
+        
+        for item in regressions:
+            print(f"❌ {item['case']}: {item['baseline'] * 1e6:.1f} µs -> "
+                  f"{item['current'] * 1e6:.1f} µs ({item['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"✓ No regressions above {args.threshold:.0%}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
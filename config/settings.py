@@ -26,8 +26,54 @@ class Settings:
     MAX_ITERATIONS: int = int(os.getenv("MAX_ITERATIONS", "10"))
     ENABLE_LOGGING: bool = os.getenv("ENABLE_LOGGING", "true").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    
+    # Metrics (Prometheus text format, written to LOG_DIR and optional HTTP endpoint)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_FILE: str = os.getenv("METRICS_FILE", "metrics.prom")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))  # 0 = no HTTP endpoint
+    # Task analysis cache (keyed on normalized task, model and tool registry)
+    ANALYSIS_CACHE_SIZE: int = int(os.getenv("ANALYSIS_CACHE_SIZE", "4096"))
+    ANALYSIS_CACHE_TTL: float = float(os.getenv("ANALYSIS_CACHE_TTL", "0"))  # 0 = no expiry
+    ANALYSIS_CACHE_PERSISTENT: bool = os.getenv("ANALYSIS_CACHE_PERSISTENT", "false").lower() == "true"
+    # Planner: bounded plan history and compiled plan templates
+    PLANNER_HISTORY_SIZE: int = int(os.getenv("PLANNER_HISTORY_SIZE", "1000"))
+    PLANNER_TEMPLATE_CACHE_SIZE: int = int(os.getenv("PLANNER_TEMPLATE_CACHE_SIZE", "256"))
+    # Cost-based planning from tool/learning statistics (core/cost_model.py)
+    COST_MODEL_ENABLED: bool = os.getenv("COST_MODEL_ENABLED", "false").lower() == "true"
+    COST_MIN_SAMPLES: int = int(os.getenv("COST_MIN_SAMPLES", "5"))
+    COST_DEFAULT_LATENCY: float = float(os.getenv("COST_DEFAULT_LATENCY", "0.1"))
+    COST_PRIOR_SUCCESS: float = float(os.getenv("COST_PRIOR_SUCCESS", "0.9"))
+    COST_REFRESH_INTERVAL: float = float(os.getenv("COST_REFRESH_INTERVAL", "5"))
+    # Thread pool size for concurrent step execution (1 = sequential)
+    EXECUTOR_MAX_WORKERS: int = int(os.getenv("EXECUTOR_MAX_WORKERS", "1"))
+    EXECUTOR_HISTORY_SIZE: int = int(os.getenv("EXECUTOR_HISTORY_SIZE", "1000"))
+    # Default deadline for process_task and per-call tool timeout, in seconds (0 = none)
+    TASK_DEADLINE: float = float(os.getenv("TASK_DEADLINE", "0"))
+    TOOL_DEFAULT_TIMEOUT: float = float(os.getenv("TOOL_DEFAULT_TIMEOUT", "0"))
+    # Executor/Planner history beyond the in-memory window is spilled to DATA_DIR/history
+    HISTORY_SPILL: bool = os.getenv("HISTORY_SPILL", "true").lower() == "true"
+    
+    # Learning Persistence
+    # LEARNING_DURABILITY: none (no fsync), batched (one fsync per batch),
+    # per_record (synchronous write + fsync for every record)
+    LEARNING_DURABILITY: str = os.getenv("LEARNING_DURABILITY", "batched")
+    # LEARNING_BACKEND: jsonl (segmented log) or sqlite (indexed, SQL insights)
+    LEARNING_BACKEND: str = os.getenv("LEARNING_BACKEND", "jsonl")
+    LEARNING_BATCH_SIZE: int = int(os.getenv("LEARNING_BATCH_SIZE", "64"))
+    LEARNING_FLUSH_INTERVAL: float = float(os.getenv("LEARNING_FLUSH_INTERVAL", "0.05"))
+    LEARNING_QUEUE_SIZE: int = int(os.getenv("LEARNING_QUEUE_SIZE", "10000"))
+    
+    # Batch processing (process_batch worker start method: forkserver, spawn or fork;
+    # empty = forkserver where available, else spawn)
+    BATCH_START_METHOD: str = os.getenv("BATCH_START_METHOD", "")
     
     # Tool Configuration
+    TOOL_CACHE_SIZE: int = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+    TOOL_CACHE_TTL: float = float(os.getenv("TOOL_CACHE_TTL", "3600"))  # 0 = no expiry
+    TOOL_CACHE_PERSISTENT: bool = os.getenv("TOOL_CACHE_PERSISTENT", "false").lower() == "true"
+    TOOL_CACHE_PERSIST_MAX_MB: int = int(os.getenv("TOOL_CACHE_PERSIST_MAX_MB", "64"))  # per tool
+    TOOL_LATENCY_WINDOW: int = int(os.getenv("TOOL_LATENCY_WINDOW", "1000"))
     ENABLE_FILE_OPERATIONS: bool = os.getenv("ENABLE_FILE_OPERATIONS", "true").lower() == "true"
     ENABLE_WEB_SEARCH: bool = os.getenv("ENABLE_WEB_SEARCH", "false").lower() == "true"
     ENABLE_DATABASE: bool = os.getenv("ENABLE_DATABASE", "false").lower() == "true"
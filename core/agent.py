@@ -3,68 +3,296 @@ Main Agent Implementation
 File: core/agent.py
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import asyncio
+import multiprocessing
+import os
+import time
 from core.task_understanding import TaskUnderstanding
 from core.planning import Planner
+from core.cost_model import CostModel
 from core.execution import Executor
 from core.learning import LearningModule
 from tools.manager import ToolManager
 from config.settings import settings
+from utils.log import get_logger, setup_logging
+from utils.metrics import metrics
+
+
+logger = get_logger(__name__)
+
+STAGE_DURATION = metrics.histogram(
+    "agent_stage_duration_seconds", "Time spent per pipeline stage", ["stage"]
+)
+TASKS_TOTAL = metrics.counter(
+    "agent_tasks_total", "Processed tasks by final plan status", ["status"]
+)
+
+
+# Pipeline milik worker process pada process_batch (satu per proses)
+_batch_worker: Dict[str, Any] = {}
+
+
+def _init_batch_worker(tools: List, specs: List, executor_workers: int):
+    """Initializer worker: ToolManager dan registry tool sendiri per proses"""
+    # Worker adalah proses baru: pipeline logging dibuat sendiri
+    setup_logging(force=True)
+    
+    tool_manager = ToolManager()
+    for tool in tools:
+        # Counter dimulai dari nol; delta dikirim balik ke parent
+        tool.export_stats(reset=True)
+        tool_manager.register(tool)
+    # Tool lazy yang belum dipakai parent dibuat sendiri oleh worker
+    for spec in specs:
+        tool_manager.register_lazy(spec)
+    
+    _batch_worker.update({
+        "tool_manager": tool_manager,
+        "task_understanding": TaskUnderstanding(tool_manager=tool_manager),
+        "planner": Planner(),
+        "executor": Executor(tool_manager, max_workers=executor_workers)
+    })
+
+
+def _run_batch_task(index: int, task: str,
+                    deadline: float = None) -> Tuple[int, Dict[str, Any], Dict[str, Dict]]:
+    """Jalankan satu task di worker, tanpa learning (dicatat oleh parent)"""
+    deadline_at = AgenticSystem._deadline_at(deadline)
+    analysis = _batch_worker["task_understanding"].analyze(task)
+    plan = _batch_worker["planner"].create_plan(task, analysis)
+    result = _batch_worker["executor"].execute_plan(
+        plan, deadline=AgenticSystem._remaining(deadline_at)
+    )
+    
+    # Cegah history worker tumbuh tanpa batas
+    _batch_worker["executor"].execution_history.clear()
+    _batch_worker["planner"].plans.clear()
+    
+    tool_stats = {
+        name: tool.export_stats(reset=True)
+        for name, tool in _batch_worker["tool_manager"].tools.items()
+    }
+    response = {
+        "task": task,
+        "analysis": analysis,
+        "plan": plan.to_dict(),
+        "execution_result": result,
+        "status": result.get("plan_status")
+    }
+    return index, response, tool_stats
 
 
 class AgenticSystem:
     """Main Agentic System orchestrator"""
     
-    def __init__(self, llm_client=None):
-        print("🤖 Initializing Agentic System...")
+    def __init__(self, llm_client=None, learning: LearningModule = None):
+        setup_logging()
+        logger.info("🤖 Initializing Agentic System...")
         
         # Initialize modules
         self.tool_manager = ToolManager()
-        self.task_understanding = TaskUnderstanding(llm_client)
-        self.planner = Planner()
-        self.executor = Executor(self.tool_manager)
-        self.learning = LearningModule()
+        self.task_understanding = TaskUnderstanding(llm_client, self.tool_manager)
+        self.learning = learning or LearningModule()
         
         # Load previous learning data
         self.learning.load_from_disk()
         
-        print("✓ Agentic System initialized successfully")
+        self.cost_model = (CostModel(self.tool_manager, self.learning)
+                           if settings.COST_MODEL_ENABLED else None)
+        history_dir = settings.DATA_DIR / "history" if settings.HISTORY_SPILL else None
+        self.planner = Planner(spill_dir=history_dir and history_dir / "planner",
+                               cost_model=self.cost_model)
+        self.executor = Executor(
+            self.tool_manager, spill_dir=history_dir and history_dir / "executor"
+        )
+        
+        if settings.METRICS_ENABLED and settings.METRICS_PORT:
+            metrics.serve(settings.METRICS_PORT)
+            logger.info("📈 Metrics endpoint on http://127.0.0.1:%d/metrics",
+                        settings.METRICS_PORT)
+        
+        logger.info("✓ Agentic System initialized successfully")
     
     def register_tool(self, tool):
         """Register a tool to the system"""
         self.tool_manager.register(tool)
     
-    def process_task(self, task: str) -> Dict[str, Any]:
-        """Process a task end-to-end"""
-        print(f"\n{'='*60}")
-        print(f"🎯 Processing Task: {task}")
-        print(f"{'='*60}\n")
+    def register_default_tools(self, specs=None) -> List[str]:
+        """Register tool dari manifest/entry point tanpa meng-import modulnya"""
+        return self.tool_manager.register_specs(specs)
+    
+    def process_task(self, task: str, deadline: float = None) -> Dict[str, Any]:
+        """Process a task end-to-end
+        
+        `deadline` (detik, default settings.TASK_DEADLINE) mencakup seluruh
+        pipeline; sisa waktunya setelah analysis dan planning menjadi
+        deadline eksekusi plan.
+        """
+        logger.info("🎯 Processing Task: %s", task)
+        deadline_at = self._deadline_at(deadline)
         
         # Step 1: Understand the task
-        analysis = self.task_understanding.analyze(task)
+        with STAGE_DURATION.time(stage="analysis"):
+            analysis = self.task_understanding.analyze(task)
         
         # Step 2: Create execution plan
-        plan = self.planner.create_plan(task, analysis)
+        with STAGE_DURATION.time(stage="planning"):
+            plan = self.planner.create_plan(task, analysis)
         
         # Step 3: Execute the plan
-        result = self.executor.execute_plan(plan)
+        with STAGE_DURATION.time(stage="execution"):
+            result = self.executor.execute_plan(plan, deadline=self._remaining(deadline_at))
         
         # Step 4: Learn from execution
-        self.learning.record_execution(plan.to_dict(), result)
+        plan_dict = plan.to_dict()
+        with STAGE_DURATION.time(stage="learning"):
+            self.learning.record_execution(plan_dict, result)
         
-        # Return comprehensive result
+        TASKS_TOTAL.inc(status=result.get("plan_status"))
+        return self._build_response(task, analysis, plan_dict, result)
+    
+    async def aprocess_task(self, task: str, deadline: float = None) -> Dict[str, Any]:
+        """Versi async dari process_task() untuk dipakai di aplikasi asyncio"""
+        logger.info("🎯 Processing Task: %s", task)
+        deadline_at = self._deadline_at(deadline)
+        
+        # Analysis dan planning murni CPU dan cepat, jalankan langsung
+        with STAGE_DURATION.time(stage="analysis"):
+            analysis = self.task_understanding.analyze(task)
+        with STAGE_DURATION.time(stage="planning"):
+            plan = self.planner.create_plan(task, analysis)
+        
+        with STAGE_DURATION.time(stage="execution"):
+            result = await self.executor.aexecute_plan(
+                plan, deadline=self._remaining(deadline_at)
+            )
+        
+        plan_dict = plan.to_dict()
+        with STAGE_DURATION.time(stage="learning"):
+            if self.learning.writer:
+                # Hanya memasukkan record ke antrian background writer
+                self.learning.record_execution(plan_dict, result)
+            else:
+                # Durability per_record menulis ke disk secara sinkron
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    None, self.learning.record_execution, plan_dict, result
+                )
+        
+        TASKS_TOTAL.inc(status=result.get("plan_status"))
+        return self._build_response(task, analysis, plan_dict, result)
+    
+    @staticmethod
+    def _deadline_at(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            deadline = settings.TASK_DEADLINE or None
+        return time.monotonic() + deadline if deadline is not None else None
+    
+    @staticmethod
+    def _remaining(deadline_at: Optional[float]) -> Optional[float]:
+        if deadline_at is None:
+            return None
+        return max(0.0, deadline_at - time.monotonic())
+    
+    def process_batch(self, tasks: Iterable[str], workers: int = None,
+                      deadline: float = None) -> List[Dict[str, Any]]:
+        """Proses banyak task sekaligus di process pool, hasil sesuai urutan input"""
+        tasks = list(tasks)
+        results: List[Dict[str, Any]] = [None] * len(tasks)
+        for index, response in self.iter_batch(tasks, workers=workers, deadline=deadline):
+            results[index] = response
+        return results
+    
+    def iter_batch(self, tasks: Iterable[str], workers: int = None,
+                   deadline: float = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Proses task di process pool dan yield (index, result) begitu selesai
+        
+        Setiap worker memiliki ToolManager sendiri. `deadline` berlaku per
+        task, dihitung sejak worker mulai memprosesnya. Learning record dan
+        statistik tool dari worker digabung ke LearningModule dan counter
+        BaseTool milik proses ini.
+        """
+        tasks = list(tasks)
+        workers = workers or os.cpu_count() or 1
+        tools = list(self.tool_manager.tools.values())
+        specs = self.tool_manager.pending_specs()
+        
+        logger.info("📦 [Batch] Processing %d tasks with %d workers...", len(tasks), workers)
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=self._batch_context(),
+            initializer=_init_batch_worker,
+            initargs=(tools, specs, self.executor.max_workers)
+        ) as pool:
+            futures = [
+                pool.submit(_run_batch_task, index, task, deadline)
+                for index, task in enumerate(tasks)
+            ]
+            
+            for future in as_completed(futures):
+                index, response, tool_stats = future.result()
+                
+                for name, stats in tool_stats.items():
+                    tool = self.tool_manager.get(name)
+                    if tool:
+                        tool.merge_stats(stats)
+                self.learning.record_execution(response["plan"], response["execution_result"])
+                TASKS_TOTAL.inc(status=response["status"])
+                
+                yield index, response
+    
+    @staticmethod
+    def _batch_context():
+        """Context multiprocessing untuk worker batch (BATCH_START_METHOD)
+        
+        Default forkserver (spawn jika tidak tersedia): fork dari proses
+        yang sudah menjalankan thread (logging listener, executor pool,
+        learning writer) bisa mewarisi lock yang sedang dipegang.
+        """
+        method = settings.BATCH_START_METHOD
+        if not method:
+            available = multiprocessing.get_all_start_methods()
+            method = "forkserver" if "forkserver" in available else "spawn"
+        return multiprocessing.get_context(method)
+    
+    def _build_response(self, task: str, analysis: Dict[str, Any], plan: Dict[str, Any],
+                        result: Dict[str, Any]) -> Dict[str, Any]:
+        """Return comprehensive result (plan sudah dalam bentuk dict)"""
         return {
             "task": task,
             "analysis": analysis,
-            "plan": plan.to_dict(),
+            "plan": plan,
             "execution_result": result,
             "status": result.get("plan_status")
         }
     
+    def flush(self):
+        """Pastikan semua learning record sudah tersimpan ke disk"""
+        self.learning.flush()
+    
+    def export_metrics(self, path: str = None):
+        """Tulis metrics (format teks Prometheus) ke file, default LOG_DIR/metrics.prom"""
+        return metrics.write(path)
+    
+    def close(self):
+        """Flush dan hentikan background writer serta thread pool executor"""
+        self.executor.shutdown()
+        self.planner.close()
+        self.learning.close()
+        if settings.METRICS_ENABLED:
+            try:
+                self.export_metrics()
+            except OSError as e:
+                logger.warning("⚠️  Cannot write metrics file: %s", e)
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get system statistics"""
         return {
             "tools": self.tool_manager.get_statistics(),
+            "analysis_cache": self.task_understanding.get_cache_stats(),
             "learning": self.learning.get_insights()
         }
     
@@ -0,0 +1,147 @@
+"""
+Cost Model for Planning
+File: core/cost_model.py
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import threading
+import time
+from core.planning import Step
+from tools.manager import ToolManager
+from config.settings import settings
+from utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ToolCost(NamedTuple):
+    """Estimasi biaya satu tool"""
+    tool: str
+    latency: float  # detik per call (rata-rata)
+    success_rate: float
+    samples: int
+    source: str  # "live", "learning" atau "prior"
+    
+    @property
+    def expected_cost(self) -> float:
+        """Latency yang diharapkan sampai berhasil (latency / success rate)"""
+        return self.latency / max(self.success_rate, 0.01)
+
+
+class CostModel:
+    """Estimasi latency dan success rate tool dari statistik historis
+    
+    Sumber, berurutan: statistik live dari BaseTool (proses ini), lalu
+    statistik LearningModule (seluruh history di disk), lalu prior dari
+    settings. Sebuah sumber baru dipakai jika sampelnya >= min_samples.
+    Success rate di-smoothing ke arah prior supaya sedikit kegagalan
+    awal tidak langsung membalik urutan plan.
+    
+    Estimasi di-cache per tool selama refresh_interval detik, sehingga
+    create_plan tidak menghitung ulang statistik pada setiap task.
+    """
+    
+    PRIOR_WEIGHT = 2
+    
+    def __init__(self, tool_manager: ToolManager, learning=None,
+                 min_samples: int = None, default_latency: float = None,
+                 prior_success: float = None, refresh_interval: float = None):
+        self.tool_manager = tool_manager
+        self.learning = learning
+        self.min_samples = min_samples if min_samples is not None else settings.COST_MIN_SAMPLES
+        self.default_latency = (default_latency if default_latency is not None
+                                else settings.COST_DEFAULT_LATENCY)
+        self.prior_success = (prior_success if prior_success is not None
+                              else settings.COST_PRIOR_SUCCESS)
+        self.refresh_interval = (refresh_interval if refresh_interval is not None
+                                 else settings.COST_REFRESH_INTERVAL)
+        
+        # capability -> tool yang saling bisa menggantikan
+        self.alternatives: Dict[str, List[str]] = {}
+        self._cache: Dict[str, Tuple[float, ToolCost]] = {}
+        self._learning_costs: Optional[Dict[str, Dict]] = None
+        self._learning_loaded_at = 0.0
+        self._lock = threading.Lock()
+    
+    def register_alternative(self, capability: str, tool: str):
+        """Daftarkan `tool` sebagai kandidat untuk kebutuhan `capability`"""
+        candidates = self.alternatives.setdefault(capability, [])
+        if tool not in candidates:
+            candidates.append(tool)
+    
+    def estimate(self, tool: str) -> ToolCost:
+        """Estimasi biaya tool (di-cache selama refresh_interval)"""
+        now = time.monotonic()
+        cached = self._cache.get(tool)
+        if cached is not None and now - cached[0] < self.refresh_interval:
+            return cached[1]
+        
+        cost = self._estimate(tool, now)
+        self._cache[tool] = (now, cost)
+        return cost
+    
+    def _estimate(self, tool: str, now: float) -> ToolCost:
+        instance = self.tool_manager.tools.get(tool)
+        if instance is not None:
+            stats = instance.get_cost_stats()
+            if stats["calls"] >= self.min_samples:
+                latency = stats["mean_latency"] if stats["latency_samples"] else None
+                return self._cost(tool, stats["calls"], stats["successes"], latency, "live")
+        
+        stats = self._learning_stats(now).get(tool)
+        if stats is not None and stats["calls"] >= self.min_samples:
+            return self._cost(tool, stats["calls"], stats["successes"],
+                              stats["mean_latency"], "learning")
+        
+        return ToolCost(tool, self.default_latency, self.prior_success, 0, "prior")
+    
+    def _cost(self, tool: str, calls: int, successes: int, latency: Optional[float],
+              source: str) -> ToolCost:
+        # Latency hanya diukur dari call yang berhasil
+        if latency is None:
+            latency = self.default_latency
+        success_rate = ((successes + self.prior_success * self.PRIOR_WEIGHT)
+                        / (calls + self.PRIOR_WEIGHT))
+        return ToolCost(tool, latency, success_rate, calls, source)
+    
+    def _learning_stats(self, now: float) -> Dict[str, Dict]:
+        if self.learning is None:
+            return {}
+        with self._lock:
+            if (self._learning_costs is None
+                    or now - self._learning_loaded_at >= self.refresh_interval):
+                self._learning_costs = self.learning.get_tool_costs()
+                self._learning_loaded_at = now
+            return self._learning_costs
+    
+    def resolve(self, capability: str) -> str:
+        """Tool termurah di antara capability itu sendiri dan alternatifnya"""
+        alternatives = self.alternatives.get(capability)
+        if not alternatives:
+            return capability
+        
+        candidates = [
+            tool for tool in dict.fromkeys([capability, *alternatives])
+            if tool in self.tool_manager.tools or tool in self.tool_manager.specs
+        ]
+        if not candidates:
+            return capability
+        
+        chosen = min(candidates, key=lambda tool: self.estimate(tool).expected_cost)
+        if chosen != capability:
+            logger.debug("   Cost model: %s -> %s", capability, chosen)
+        return chosen
+    
+    def order(self, tools: Iterable[str]) -> List[str]:
+        """Urutkan tool dari expected cost terkecil (stabil untuk biaya sama)
+        
+        Tool mahal atau yang sering gagal berada di belakang, sehingga
+        step murah menjadi prasyaratnya dan kegagalan tidak membuang
+        pekerjaan step mahal yang sudah berjalan sebelumnya.
+        """
+        return sorted(tools, key=lambda tool: self.estimate(tool).expected_cost)
+    
+    def step_latency(self, step: Step) -> float:
+        """Estimasi durasi step; step tanpa tool dianggap gratis"""
+        return self.estimate(step.tool).latency if step.tool else 0.0
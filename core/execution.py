@@ -3,24 +3,125 @@ Execution Module
 File: core/execution.py
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime
-from core.planning import Plan, Step
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from core.planning import Plan, Step, PlanValidationError
+from memory.history import BoundedHistory
+from memory.result_store import ResultStore
 from tools.manager import ToolManager
+from config.settings import settings
+from utils.log import get_logger
+from utils.metrics import metrics
+
+
+logger = get_logger(__name__)
+
+STEP_DURATION = metrics.histogram(
+    "executor_step_duration_seconds", "Plan step execution time",
+    ["tool", "category", "status"]
+)
 
 
 class Executor:
     """Modul untuk mengeksekusi plan"""
     
-    def __init__(self, tool_manager: ToolManager):
+    def __init__(self, tool_manager: ToolManager, max_workers: int = None,
+                 history_size: int = None, spill_dir: str = None):
         self.tool_manager = tool_manager
-        self.execution_history = []
+        # N eksekusi terakhir di memory, sisanya di-spill ke disk (jika spill_dir)
+        self.execution_history = BoundedHistory(
+            history_size or settings.EXECUTOR_HISTORY_SIZE,
+            spill_dir=spill_dir,
+            serialize=self._serialize_entry
+        )
+        self.max_workers = max_workers or settings.EXECUTOR_MAX_WORKERS
+        self._pool = None
+        # Menyerialkan transisi akhir step (selesai vs timed_out)
+        self._finish_lock = threading.Lock()
     
-    def execute_plan(self, plan: Plan) -> Dict[str, Any]:
-        """Execute plan step by step"""
-        print(f"⚙️  [Executor] Starting plan execution...")
+    def execute_plan(self, plan: Plan, concurrent: bool = None,
+                     deadline: float = None) -> Dict[str, Any]:
+        """Execute plan step by step, or concurrently when max_workers > 1
+        
+        `deadline` adalah batas waktu seluruh plan dalam detik. Setiap step
+        mendapat sisa waktu plan, dibatasi timeout default tool-nya; step
+        yang melewati budget berstatus "timed_out" dan step yang belum
+        mulai saat deadline lewat berstatus "cancelled". Tool yang hang
+        setelah timeout ditinggalkan (lihat _spawn), bukan dihentikan.
+        
+        Hasil step yang dipakai step lain lewat StepInput dipegang
+        ResultStore dan diteruskan tanpa copy, lalu dilepas begitu semua
+        konsumennya selesai.
+        """
+        logger.info("⚙️  [Executor] Starting plan execution...")
+        
+        if concurrent is None:
+            concurrent = self.max_workers > 1
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        
+        invalid = self._validate(plan)
+        if invalid:
+            return invalid
         
         plan.status = "executing"
+        store = self._result_store(plan)
+        
+        if concurrent:
+            results = self._execute_concurrent(plan, deadline_at=deadline_at, store=store)
+        elif deadline_at is not None or self._has_timeouts(plan):
+            # Timeout butuh thread terpisah; limit=1 menjaga urutan sequential
+            results = self._execute_concurrent(plan, limit=1, deadline_at=deadline_at,
+                                               store=store)
+        else:
+            results = self._execute_sequential(plan, store)
+        
+        return self._finish_plan(plan, results, deadline_at=deadline_at, store=store)
+    
+    async def aexecute_plan(self, plan: Plan, deadline: float = None) -> Dict[str, Any]:
+        """Execute plan di event loop: semua step yang siap berjalan bersamaan"""
+        logger.info("⚙️  [Executor] Starting plan execution...")
+        
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        invalid = self._validate(plan)
+        if invalid:
+            return invalid
+        
+        plan.status = "executing"
+        store = self._result_store(plan)
+        results = []
+        running = {}
+        
+        while True:
+            if not self._expired(deadline_at):
+                for step in plan.get_next_steps():
+                    step.status = "in_progress"
+                    budget = self._step_budget(step, deadline_at)
+                    task = asyncio.ensure_future(self._aexecute_step(step, plan, budget, store))
+                    running[task] = step
+            
+            if not running:
+                break
+            
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.pop(task)
+                results.append(task.result())
+        
+        return self._finish_plan(plan, results, deadline_at=deadline_at, store=store)
+    
+    @staticmethod
+    def _result_store(plan: Plan) -> Optional[ResultStore]:
+        """ResultStore untuk plan dengan data edge; None jika tidak ada"""
+        consumers = plan.data_consumers()
+        return ResultStore(consumers) if consumers else None
+    
+    def _execute_sequential(self, plan: Plan,
+                            store: ResultStore = None) -> List[Dict[str, Any]]:
+        """Jalankan step satu per satu sesuai urutan dependency"""
         results = []
         
         while True:
@@ -28,81 +129,374 @@ class Executor:
             next_steps = plan.get_next_steps()
             
             if not next_steps:
-                # Check if all steps are completed
-                all_completed = all(step.status == "completed" for step in plan.steps)
-                if all_completed:
-                    plan.status = "completed"
-                    break
-                else:
-                    # Some steps failed or blocked
-                    plan.status = "failed"
-                    break
+                break
             
             # Execute each ready step
             for step in next_steps:
-                result = self._execute_step(step, plan)
+                result = self._execute_step(step, plan, store)
                 results.append(result)
         
+        return results
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="executor"
+            )
+        return self._pool
+    
+    @staticmethod
+    def _spawn(fn, *args) -> Future:
+        """Jalankan fn di daemon thread sendiri (dipakai untuk step ber-timeout)
+        
+        Thread Python tidak bisa dihentikan paksa: tool yang hang setelah
+        timeout ditinggalkan dan terus berjalan sampai selesai sendiri.
+        Karena daemon, thread itu tidak menahan exit interpreter dan tidak
+        memblokir worker pool untuk step berikutnya.
+        """
+        future = Future()
+        
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=run, name="executor-step", daemon=True).start()
+        return future
+    
+    def _execute_concurrent(self, plan: Plan, limit: int = None, deadline_at: float = None,
+                            store: ResultStore = None) -> List[Dict[str, Any]]:
+        """Jalankan semua step yang siap secara bersamaan (DAG scheduling)
+        
+        Setiap step dependent langsung dijadwalkan begitu semua
+        dependency-nya selesai, sehingga durasi plan mengikuti critical path.
+        `limit` membatasi jumlah step yang berjalan.
+        
+        Jika ada deadline atau timeout tool, setiap step berjalan di daemon
+        thread sendiri (maksimal max_workers sekaligus) dan step yang
+        melewati budget ditandai timed_out tanpa menunggu thread-nya.
+        Timeout tool dihitung sejak step mulai berjalan; deadline plan
+        dihitung dari waktu dinding.
+        """
+        timed = deadline_at is not None or self._has_timeouts(plan)
+        if timed:
+            limit = min(limit or self.max_workers, self.max_workers)
+        results = []
+        running = {}  # future -> (step, tool timeout, submitted_at)
+        
+        while True:
+            if not self._expired(deadline_at):
+                for step in plan.get_next_steps():
+                    if limit is not None and len(running) >= limit:
+                        break
+                    # Tandai sebelum submit supaya tidak dijadwalkan dua kali
+                    step.status = "in_progress"
+                    if timed:
+                        future = self._spawn(self._execute_step, step, plan, store)
+                    else:
+                        future = self._get_pool().submit(self._execute_step, step, plan, store)
+                    timeout = self._tool_timeout(step.tool) if timed and step.tool else None
+                    running[future] = (step, timeout, time.monotonic())
+            
+            if not running:
+                break
+            
+            expiries = [expiry for expiry in (self._step_expiry(*entry, deadline_at)
+                                              for entry in running.values())
+                        if expiry is not None]
+            timeout = max(0.0, min(expiries) - time.monotonic()) if expiries else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.pop(future)
+                results.append(future.result())
+            
+            now = time.monotonic()
+            for future, entry in list(running.items()):
+                expiry = self._step_expiry(*entry, deadline_at)
+                if expiry is None or now < expiry:
+                    continue
+                step, _, submitted_at = running.pop(future)
+                started = step.started_at if step.started_at is not None else submitted_at
+                result = self._timeout_step(step, now - started, store)
+                # Step selesai tepat sebelum ditandai timed out
+                results.append(result if result is not None else future.result())
+        
+        return results
+    
+    @staticmethod
+    def _step_expiry(step: Step, timeout: Optional[float], submitted_at: float,
+                     deadline_at: Optional[float]) -> Optional[float]:
+        """Waktu habis step: timeout tool sejak step mulai, dibatasi deadline plan"""
+        expiry = deadline_at
+        if timeout is not None:
+            started = step.started_at if step.started_at is not None else submitted_at
+            expiry = started + timeout if expiry is None else min(expiry, started + timeout)
+        return expiry
+    
+    def _tool_timeout(self, name: str) -> Optional[float]:
+        tool = self.tool_manager.get(name)
+        timeout = getattr(tool, "default_timeout", None)
+        if timeout is None:
+            timeout = settings.TOOL_DEFAULT_TIMEOUT
+        return timeout or None
+    
+    def _has_timeouts(self, plan: Plan) -> bool:
+        return any(self._tool_timeout(step.tool) for step in plan.steps if step.tool)
+    
+    def _step_budget(self, step: Step, deadline_at: float = None) -> Optional[float]:
+        """Sisa waktu plan, dibatasi timeout default tool step ini"""
+        budget = self._tool_timeout(step.tool) if step.tool else None
+        if deadline_at is not None:
+            remaining = max(0.0, deadline_at - time.monotonic())
+            budget = remaining if budget is None else min(budget, remaining)
+        return budget
+    
+    @staticmethod
+    def _expired(deadline_at: Optional[float]) -> bool:
+        return deadline_at is not None and time.monotonic() >= deadline_at
+    
+    def _validate(self, plan: Plan) -> Dict[str, Any]:
+        """Validasi plan sebelum eksekusi; return hasil gagal jika invalid"""
+        try:
+            plan.validate()
+        except PlanValidationError as e:
+            logger.warning("   Invalid plan: %s", e)
+            plan.status = "failed"
+            return self._finish_plan(plan, [], error=str(e))
+        return None
+    
+    def _finish_plan(self, plan: Plan, results: List[Dict[str, Any]], error: str = None,
+                     deadline_at: float = None, store: ResultStore = None) -> Dict[str, Any]:
+        """Susun hasil eksekusi dan simpan ke history"""
+        if store is not None:
+            # Hasil untuk konsumen yang tidak akan jalan (gagal/dibatalkan)
+            store.clear()
+            logger.debug("   Intermediate results: peak %d held, %d freed",
+                         store.peak, store.freed)
+        
+        if error is None and self._expired(deadline_at):
+            # Step yang tidak sempat dijadwalkan sebelum deadline
+            for step in plan.steps:
+                if step.status == "pending":
+                    step.status = "cancelled"
+        
+        if error is None:
+            if plan.count_status("completed") == len(plan.steps):
+                plan.status = "completed"
+            elif plan.count_status("timed_out") or plan.count_status("cancelled"):
+                # Step melewati budget, atau sisa step dibatalkan karena deadline
+                plan.status = "timed_out"
+            else:
+                # Some steps failed or blocked
+                plan.status = "failed"
+        
         execution_result = {
             "plan_status": plan.status,
-            "steps_executed": len([s for s in plan.steps if s.status == "completed"]),
-            "steps_failed": len([s for s in plan.steps if s.status == "failed"]),
+            "steps_executed": plan.count_status("completed"),
+            "steps_failed": plan.count_status("failed"),
+            "steps_timed_out": plan.count_status("timed_out"),
+            "steps_cancelled": plan.count_status("cancelled"),
+            "duration": plan.duration,
             "results": results
         }
+        if error is not None:
+            execution_result["error"] = error
         
+        # Snapshot ringan; dict plan baru dibuat saat history di-serialisasi
         self.execution_history.append({
-            "plan": plan.to_dict(),
+            "plan": plan.snapshot(),
             "result": execution_result,
             "timestamp": datetime.now().isoformat()
         })
         
-        print(f"   Execution completed: {plan.status}")
+        logger.info("   Execution completed: %s", plan.status)
         return execution_result
     
-    def _execute_step(self, step: Step, plan: Plan) -> Dict[str, Any]:
+    def _execute_step(self, step: Step, plan: Plan,
+                      store: ResultStore = None) -> Dict[str, Any]:
         """Execute single step"""
-        print(f"   Executing Step {step.step_id}: {step.description}")
+        if not self._start_step(step):
+            return None
         
-        step.status = "in_progress"
-        step.started_at = datetime.now().isoformat()
+        try:
+            if step.tool:
+                # Execute using tool with fixed params + outputs of upstream steps
+                result = self.tool_manager.execute(step.tool, **self._step_kwargs(step, store))
+            else:
+                result = None
+            return self._complete_step(step, result, store)
+        
+        except Exception as e:
+            return self._fail_step(step, e)
+        
+        finally:
+            self._release_inputs(step, store)
+            self._observe_step(step)
+    
+    async def _aexecute_step(self, step: Step, plan: Plan, budget: float = None,
+                             store: ResultStore = None) -> Dict[str, Any]:
+        """Versi async dari _execute_step(); tool dibatalkan setelah `budget` detik"""
+        self._start_step(step)
         
         try:
             if step.tool:
-                # Execute using tool
-                # This is simplified - in real implementation, 
-                # you'd parse parameters from step description
-                result = self.tool_manager.execute(step.tool)
-                step.result = result
-                
-                if result.get("success"):
-                    step.status = "completed"
-                else:
-                    step.status = "failed"
-                    step.error = result.get("error")
+                call = self.tool_manager.aexecute(step.tool, **self._step_kwargs(step, store))
+                if budget is not None:
+                    call = asyncio.wait_for(call, budget)
+                result = await call
             else:
-                # No tool needed, mark as completed
-                step.status = "completed"
-                step.result = {"message": "Step completed without tool execution"}
-            
-            step.completed_at = datetime.now().isoformat()
-            
-            return {
-                "step_id": step.step_id,
-                "status": step.status,
-                "result": step.result
-            }
+                result = None
+            return self._complete_step(step, result, store)
+        
+        except asyncio.TimeoutError:
+            return self._timeout_step(step, budget, store)
         
         except Exception as e:
-            step.status = "failed"
-            step.error = str(e)
-            step.completed_at = datetime.now().isoformat()
+            return self._fail_step(step, e)
+        
+        finally:
+            self._release_inputs(step, store)
+            self._observe_step(step)
+    
+    @staticmethod
+    def _step_kwargs(step: Step, store: Optional[ResultStore]) -> Dict[str, Any]:
+        """kwargs tool: params tetap + hasil step sumber (referensi, bukan copy)"""
+        kwargs = dict(step.params) if step.params else {}
+        if step.inputs:
+            for name, ref in step.inputs.items():
+                try:
+                    kwargs[name] = store.get(ref.step_id, ref.key)
+                except (AttributeError, KeyError, TypeError, IndexError):
+                    raise ValueError(
+                        f"Input '{name}' from step {ref.step_id} is not available"
+                    ) from None
+        return kwargs
+    
+    @staticmethod
+    def _release_inputs(step: Step, store: Optional[ResultStore]):
+        if store is not None and step.inputs:
+            store.release(step.step_id, [ref.step_id for ref in step.inputs.values()])
+    
+    @staticmethod
+    def _serialize_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {**entry, "plan": entry["plan"].to_dict()}
+    
+    def _observe_step(self, step: Step, timed_out: bool = False):
+        # Step timed out sudah dicatat oleh _timeout_step
+        if step.status == "timed_out" and not timed_out:
+            return
+        tool = self.tool_manager.get(step.tool) if step.tool else None
+        STEP_DURATION.observe(
+            step.duration or 0.0,
+            tool=step.tool or "none",
+            category=tool.metadata.category if tool else "none",
+            status=step.status
+        )
+    
+    def _start_step(self, step: Step) -> bool:
+        """Tandai step mulai; False jika step sudah timed out sebelum sempat jalan"""
+        logger.debug("   Executing Step %s: %s", step.step_id, step.description)
+        
+        with self._finish_lock:
+            if step.status == "timed_out":
+                return False
+            step.started_at = time.monotonic()
+            step.status = "in_progress"
+        return True
+    
+    def _complete_step(self, step: Step, result: Dict[str, Any] = None,
+                       store: ResultStore = None) -> Dict[str, Any]:
+        """Update status step dari hasil tool (None = step tanpa tool)"""
+        with self._finish_lock:
+            if step.status == "timed_out":
+                # Hasil terlambat dari tool yang sudah melewati budget
+                return None
+            return self._set_step_result(step, result, store)
+    
+    def _set_step_result(self, step: Step, result: Dict[str, Any] = None,
+                         store: ResultStore = None) -> Dict[str, Any]:
+        # Diisi sebelum status berubah supaya dependents melihat waktu selesai,
+        # input step ini sudah dilepas dan hasilnya sudah ada di ResultStore
+        step.completed_at = time.monotonic()
+        self._release_inputs(step, store)
+        if result is None:
+            # No tool needed, mark as completed
+            step.result = {"message": "Step completed without tool execution"}
+            if store is not None:
+                store.put(step.step_id, None)
+            step.status = "completed"
+        else:
+            step.result = result
             
-            return {
-                "step_id": step.step_id,
-                "status": "failed",
-                "error": str(e)
-            }
-    
-    def get_history(self) -> list:
-        """Get execution history"""
-        return self.execution_history
+            if result.get("success"):
+                if store is not None and store.put(step.step_id, result.get("result")):
+                    # Payload hanya dipegang ResultStore sampai konsumen selesai,
+                    # bukan oleh execution history
+                    step.result = {**result, "result": None, "handed_off": True}
+                step.status = "completed"
+            else:
+                step.status = "failed"
+                step.error = result.get("error")
+        
+        return {
+            "step_id": step.step_id,
+            "status": step.status,
+            "result": step.result
+        }
+    
+    def _fail_step(self, step: Step, error: Exception) -> Dict[str, Any]:
+        with self._finish_lock:
+            if step.status == "timed_out":
+                return None
+            step.completed_at = time.monotonic()
+            step.error = str(error)
+            step.status = "failed"
+        
+        return {
+            "step_id": step.step_id,
+            "status": "failed",
+            "error": str(error)
+        }
+    
+    def _timeout_step(self, step: Step, budget: float,
+                      store: ResultStore = None) -> Optional[Dict[str, Any]]:
+        """Tandai step timed out; None jika step sudah selesai lebih dulu"""
+        with self._finish_lock:
+            if step.status != "in_progress":
+                return None
+            step.completed_at = time.monotonic()
+            if step.started_at is None:
+                step.started_at = step.completed_at
+            step.error = f"Timed out after {budget:.3f}s"
+            step.status = "timed_out"
+        
+        logger.warning("   Step %s timed out after %.3fs", step.step_id, budget)
+        # Thread tool mungkin masih berjalan, tapi input tidak lagi ditahan di sini
+        self._release_inputs(step, store)
+        self._observe_step(step, timed_out=True)
+        return {
+            "step_id": step.step_id,
+            "status": "timed_out",
+            "tool": step.tool,
+            "error": step.error
+        }
+    
+    def get_history(self) -> List[Dict[str, Any]]:
+        """Get execution history (entry terbaru yang masih di memory)"""
+        history = self.execution_history
+        return [history.serialize(entry) for entry in history]
+    
+    def iter_history(self) -> Iterator[Dict[str, Any]]:
+        """Iterasi seluruh execution history (termasuk yang sudah di-spill)"""
+        return self.execution_history.iter_all()
+    
+    def shutdown(self):
+        """Hentikan thread pool dan hapus file spill history"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self.execution_history.close()
@@ -3,31 +3,248 @@ Learning Module
 File: core/learning.py
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Iterator, Optional
 from datetime import datetime
+from itertools import islice
+import atexit
+import copy
 import json
+import os
+import queue
+import threading
+import time
 from pathlib import Path
+from memory.segmented_log import SegmentedLog
+from memory.sqlite_store import SQLiteLearningStore
+from config.settings import settings
+from utils.log import get_logger
+from utils.metrics import metrics
+
+
+logger = get_logger(__name__)
+
+COMMIT_DURATION = metrics.histogram(
+    "learning_commit_duration_seconds", "Background writer batch commit time (write + fsync)"
+)
+COMMITTED_RECORDS = metrics.counter(
+    "learning_records_committed_total", "Learning records persisted to disk"
+)
+
+
+DURABILITY_LEVELS = ("none", "batched", "per_record")
+BACKENDS = ("jsonl", "sqlite")
+
+SNAPSHOT_VERSION = 4
+
+
+class BackgroundWriter:
+    """Thread penulis yang mengelompokkan record (group commit) ke log"""
+    
+    _STOP = object()
+    
+    def __init__(self, log: SegmentedLog, durability: str = "batched",
+                 batch_size: int = 64, flush_interval: float = 0.05,
+                 max_queue: int = 10000,
+                 on_commit: Optional[Callable[[List[Dict]], None]] = None):
+        self.log = log
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_commit = on_commit
+        
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self.batches_written = 0
+        self.records_written = 0
+        self.last_error: Optional[str] = None
+        
+        self._thread = threading.Thread(
+            target=self._run, name="learning-writer", daemon=True
+        )
+        self._thread.start()
+    
+    def submit(self, record: Dict):
+        """Masukkan record ke antrian (blocking jika antrian penuh)"""
+        self.queue.put(record)
+    
+    def flush(self, timeout: float = None) -> bool:
+        """Tunggu sampai semua record yang sudah disubmit tertulis"""
+        if not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = None):
+        """Tulis sisa antrian lalu hentikan thread"""
+        if self._thread.is_alive():
+            self.queue.put(self._STOP)
+            self._thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            batch: List[Dict] = []
+            waiters: List[threading.Event] = []
+            stop = False
+            
+            # Kumpulkan record sampai batch penuh atau interval habis
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is self._STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                
+                if stop or waiters or len(batch) >= self.batch_size:
+                    break
+                
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (self.queue.get(timeout=remaining) if remaining > 0
+                            else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            self._commit(batch)
+            for waiter in waiters:
+                waiter.set()
+            
+            if stop:
+                return
+    
+    def _commit(self, batch: List[Dict]):
+        """Satu write (dan satu fsync jika batched) per batch"""
+        if not batch:
+            return
+        try:
+            with COMMIT_DURATION.time():
+                self.log.append_many(batch, sync=self.durability == "batched")
+            COMMITTED_RECORDS.inc(len(batch))
+            self.batches_written += 1
+            self.records_written += len(batch)
+            if self.on_commit:
+                self.on_commit(batch)
+        except Exception as e:
+            # Jangan matikan writer thread karena satu batch gagal
+            self.last_error = str(e)
+            logger.error("⚠️  [Learning] Failed to persist %d record(s): %s", len(batch), e)
+
+
+def empty_metrics() -> Dict[str, Any]:
+    return {
+        "total_executions": 0,
+        "successful_executions": 0,
+        "failed_executions": 0,
+        # Subset failed_executions: plan dihentikan deadline / timeout step
+        "timed_out_executions": 0,
+        "timed_out_steps": 0,
+        "total_tools_used": 0,
+        "tool_usage": {},
+        # tool -> [calls, successes, total execution time]; input cost model
+        "tool_performance": {}
+    }
+
+
+class LearningHistory:
+    """View read-only atas execution history yang dibaca dari disk saat diakses
+    
+    Tidak ada record yang disimpan di memory; len() berasal dari counter dan
+    iterasi / indexing men-stream segment log.
+    """
+    
+    def __init__(self, module: "LearningModule"):
+        self._module = module
+    
+    def __len__(self) -> int:
+        return self._module.record_count
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._module.iter_history()
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step < 0:
+                return list(self)[index]
+            return list(islice(self._module.iter_history(), start, stop, step))
+        
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("execution history index out of range")
+        return next(islice(self._module.iter_history(), index, None))
 
 
 class LearningModule:
     """Modul untuk menyimpan dan belajar dari execution history"""
     
-    def __init__(self, storage_path: str = None):
+    def __init__(self, storage_path: str = None, max_segment_records: int = 10000,
+                 compact_every: int = 16, durability: str = None,
+                 batch_size: int = None, flush_interval: float = None,
+                 max_queue: int = None, backend: str = None):
         self.storage_path = Path(storage_path) if storage_path else Path("data/learning")
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
-        self.execution_log = []
-        self.performance_metrics = {
-            "total_executions": 0,
-            "successful_executions": 0,
-            "failed_executions": 0,
-            "total_tools_used": 0,
-            "tool_usage": {}
-        }
+        self.durability = durability or settings.LEARNING_DURABILITY
+        if self.durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"Unknown durability '{self.durability}', "
+                f"expected one of: {', '.join(DURABILITY_LEVELS)}"
+            )
+        
+        self.backend = backend or settings.LEARNING_BACKEND
+        if self.backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown learning backend '{self.backend}', "
+                f"expected one of: {', '.join(BACKENDS)}"
+            )
+        
+        if self.backend == "sqlite":
+            # Tabel terindeks; insights dan query dihitung dengan SQL
+            self.log = SQLiteLearningStore(
+                self.storage_path / "learning.db", durability=self.durability
+            )
+        else:
+            # Append-only log: satu record per baris, dipecah per segment
+            self.log = SegmentedLog(
+                self.storage_path / "execution_log",
+                max_segment_records=max_segment_records,
+                compact_every=compact_every
+            )
+        
+        # History tetap di disk; execution_log hanya view yang di-stream
+        self.execution_log = LearningHistory(self)
+        self.record_count = 0
+        self.performance_metrics = empty_metrics()
+        
+        # Metrics yang sudah tercakup record durable di log, plus posisinya.
+        # Keduanya ditulis bersama ke metrics.json sebagai snapshot startup.
+        self._durable_metrics = empty_metrics()
+        self._durable_records = 0
+        self._durable_position = self.log.position()
+        
+        self._lock = threading.Lock()
+        # Serialisasi penulisan metrics.json (tmp file + rename) antar thread
+        self._snapshot_lock = threading.Lock()
+        self.writer: Optional[BackgroundWriter] = None
+        
+        if self.durability != "per_record":
+            # Persistence dipindahkan dari request path ke background thread
+            self.writer = BackgroundWriter(
+                self.log,
+                durability=self.durability,
+                batch_size=batch_size or settings.LEARNING_BATCH_SIZE,
+                flush_interval=(flush_interval if flush_interval is not None
+                                else settings.LEARNING_FLUSH_INTERVAL),
+                max_queue=max_queue or settings.LEARNING_QUEUE_SIZE,
+                on_commit=self._on_commit
+            )
+            atexit.register(self.close)
     
     def record_execution(self, plan: Dict, result: Dict[str, Any]):
         """Record execution untuk learning"""
-        print(f"📊 [Learning] Recording execution...")
         
         execution_record = {
             "timestamp": datetime.now().isoformat(),
@@ -37,33 +254,57 @@ class LearningModule:
             "success": result.get("plan_status") == "completed"
         }
         
-        self.execution_log.append(execution_record)
-        self._update_metrics(execution_record)
-        self._save_to_disk()
+        with self._lock:
+            self.record_count += 1
+            self._update_metrics(execution_record)
+        self._save_to_disk(execution_record)
         
-        print(f"   Execution recorded. Total executions: {self.performance_metrics['total_executions']}")
+        logger.debug("📊 [Learning] Execution recorded. Total executions: %d",
+                     self.performance_metrics["total_executions"])
     
-    def _update_metrics(self, record: Dict):
+    def _update_metrics(self, record: Dict, metrics: Dict = None):
         """Update performance metrics"""
-        self.performance_metrics["total_executions"] += 1
+        metrics = self.performance_metrics if metrics is None else metrics
+        metrics["total_executions"] += 1
         
         if record["success"]:
-            self.performance_metrics["successful_executions"] += 1
+            metrics["successful_executions"] += 1
         else:
-            self.performance_metrics["failed_executions"] += 1
+            metrics["failed_executions"] += 1
+        
+        result = record.get("result") or {}
+        if result.get("plan_status") == "timed_out":
+            metrics["timed_out_executions"] += 1
+        metrics["timed_out_steps"] += result.get("steps_timed_out", 0)
         
         # Track tool usage
         steps = record["plan"].get("steps", [])
         for step in steps:
             tool = step.get("tool")
             if tool:
-                self.performance_metrics["total_tools_used"] += 1
-                if tool not in self.performance_metrics["tool_usage"]:
-                    self.performance_metrics["tool_usage"][tool] = 0
-                self.performance_metrics["tool_usage"][tool] += 1
+                metrics["total_tools_used"] += 1
+                if tool not in metrics["tool_usage"]:
+                    metrics["tool_usage"][tool] = 0
+                metrics["tool_usage"][tool] += 1
+        
+        for step_result in result.get("results", []):
+            call = step_result.get("result")
+            if step_result.get("status") == "timed_out" and step_result.get("tool"):
+                # Timeout dihitung sebagai call gagal
+                call = {"tool": step_result["tool"], "success": False}
+            if isinstance(call, dict) and call.get("tool") and not call.get("cached"):
+                performance = metrics["tool_performance"].setdefault(call["tool"], [0, 0, 0.0])
+                performance[0] += 1
+                if call.get("success"):
+                    performance[1] += 1
+                    performance[2] += call.get("execution_time") or 0.0
     
     def get_insights(self) -> Dict[str, Any]:
         """Generate insights dari execution history"""
+        if self.backend == "sqlite":
+            self.flush()
+            return self.log.insights()
+        
         metrics = self.performance_metrics
         
         success_rate = (
@@ -83,6 +324,7 @@ class LearningModule:
             "success_rate": f"{success_rate:.1f}%",
             "successful": metrics["successful_executions"],
             "failed": metrics["failed_executions"],
+            "timed_out": metrics["timed_out_executions"],
             "total_tools_used": metrics["total_tools_used"],
             "most_used_tools": [
                 {"tool": tool, "count": count}
@@ -92,28 +334,194 @@ class LearningModule:
         
         return insights
     
-    def _save_to_disk(self):
-        """Save execution log to disk"""
-        log_file = self.storage_path / "execution_log.json"
+    def _save_to_disk(self, record: Dict):
+        """Append record ke log dan simpan snapshot metrics - O(1) per record"""
+        if self.writer:
+            self.writer.submit(record)
+            return
+        
+        with self._lock:
+            self.log.append(record, sync=True)
+            self._advance_snapshot([record])
+        self._save_metrics()
+    
+    def _on_commit(self, batch: List[Dict]):
+        """Dipanggil writer thread setelah batch durable di log"""
+        with self._lock:
+            self._advance_snapshot(batch)
+        self._save_metrics()
+    
+    def _advance_snapshot(self, batch: List[Dict]):
+        """Majukan metrics durable dan posisi log (caller memegang _lock)"""
+        for record in batch:
+            self._update_metrics(record, self._durable_metrics)
+        self._durable_records += len(batch)
+        self._durable_position = self.log.position()
+    
+    def _save_metrics(self):
+        """Tulis snapshot metrics secara atomic (tmp file + rename)
+        
+        Snapshot berisi metrics dan posisi log yang sudah tercakup, sehingga
+        startup hanya perlu me-replay record setelah posisi tersebut.
+        Caller bisa berasal dari beberapa thread (per_record tanpa writer),
+        jadi snapshot, tulis dan rename dilakukan di bawah _snapshot_lock:
+        tmp file tidak diperebutkan dan snapshot lama tidak menimpa yang baru.
+        """
         metrics_file = self.storage_path / "metrics.json"
+        tmp_file = metrics_file.with_suffix(".json.tmp")
+        
+        with self._snapshot_lock:
+            with self._lock:
+                snapshot = json.dumps({
+                    "version": SNAPSHOT_VERSION,
+                    "metrics": self._durable_metrics,
+                    "log_records": self._durable_records,
+                    "log_position": self._durable_position
+                }, indent=2)
+            
+            with open(tmp_file, 'w') as f:
+                f.write(snapshot)
+                if self.durability != "none":
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, metrics_file)
+    
+    def _migrate_legacy_log(self):
+        """Pindahkan execution_log.json format lama ke segmented log"""
+        legacy_file = self.storage_path / "execution_log.json"
+        if not legacy_file.exists():
+            return
         
-        with open(log_file, 'w') as f:
-            json.dump(self.execution_log, f, indent=2)
+        with open(legacy_file, 'r') as f:
+            try:
+                records = json.load(f)
+            except json.JSONDecodeError:
+                records = []
         
-        with open(metrics_file, 'w') as f:
-            json.dump(self.performance_metrics, f, indent=2)
+        self.log.append_many(records, sync=True)
+        os.replace(legacy_file, legacy_file.with_suffix(".json.migrated"))
     
-    def load_from_disk(self):
-        """Load execution log from disk"""
-        log_file = self.storage_path / "execution_log.json"
+    def _migrate_segmented_log(self, batch_size: int = 1000):
+        """Impor segmented log ke database sqlite yang masih kosong"""
+        segment_dir = self.storage_path / "execution_log"
+        if not self.log.is_empty() or not any(segment_dir.glob(f"{SegmentedLog.SEGMENT_PREFIX}*")):
+            return
+        
+        source = SegmentedLog(segment_dir)
+        batch = []
+        for record in source:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.log.append_many(batch)
+                batch = []
+        self.log.append_many(batch)
+        source.close()
+        logger.info("📊 [Learning] Imported segmented log into %s", self.log.path)
+    
+    def compact(self):
+        """Kompaksi segment log yang sudah ditutup"""
+        self.flush()
+        with self._lock:
+            self.log.compact()
+    
+    def _load_snapshot(self) -> Optional[Dict[str, Any]]:
         metrics_file = self.storage_path / "metrics.json"
+        try:
+            with open(metrics_file, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        # metrics.json format lama hanya berisi metrics tanpa posisi log
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        return snapshot
+    
+    def load_from_disk(self):
+        """Load metrics snapshot lalu replay record setelah posisi snapshot
         
-        if log_file.exists():
-            with open(log_file, 'r') as f:
-                self.execution_log = json.load(f)
+        Biaya startup sebanding dengan jumlah record sejak snapshot terakhir,
+        bukan panjang history. History sendiri tetap di disk.
+        """
+        self.flush()
+        self._migrate_legacy_log()
+        if self.backend == "sqlite":
+            self._migrate_segmented_log()
         
-        if metrics_file.exists():
-            with open(metrics_file, 'r') as f:
-                self.performance_metrics = json.load(f)
+        snapshot = self._load_snapshot()
+        tail = self.log.tail(snapshot["log_position"]) if snapshot else None
+        if tail is None:
+            # Tidak ada snapshot yang valid: bangun ulang dari seluruh log
+            snapshot = {"metrics": empty_metrics(), "log_records": 0}
+            tail = iter(self.log)
+        
+        metrics = snapshot["metrics"]
+        replayed = 0
+        for record in tail:
+            self._update_metrics(record, metrics)
+            replayed += 1
         
-        print(f"📊 [Learning] Loaded {len(self.execution_log)} execution records")
+        with self._lock:
+            self._durable_metrics = metrics
+            self._durable_records = snapshot["log_records"] + replayed
+            self._durable_position = self.log.position()
+            self.performance_metrics = copy.deepcopy(metrics)
+            self.record_count = self._durable_records
+        if replayed:
+            self._save_metrics()
+        
+        if self.log.corrupt_records:
+            logger.warning("⚠️  [Learning] Skipped %d corrupt record(s)", self.log.corrupt_records)
+        logger.info("📊 [Learning] Loaded %d execution records (%d replayed from log)",
+                    self.record_count, replayed)
+    
+    def get_tool_costs(self) -> Dict[str, Dict[str, Any]]:
+        """Jumlah call, success dan rata-rata latency per tool dari seluruh history"""
+        with self._lock:
+            performance = {tool: list(values) for tool, values
+                           in self.performance_metrics["tool_performance"].items()}
+        return {
+            tool: {
+                "calls": calls,
+                "successes": successes,
+                "mean_latency": total_time / successes if successes else None
+            }
+            for tool, (calls, successes, total_time) in performance.items()
+        }
+    
+    def _sql_store(self) -> SQLiteLearningStore:
+        if self.backend != "sqlite":
+            raise RuntimeError("This query requires LEARNING_BACKEND=sqlite")
+        self.flush()
+        return self.log
+    
+    def get_window_stats(self, seconds: float = 3600) -> Dict[str, Any]:
+        """Jumlah, success rate dan durasi eksekusi dalam `seconds` terakhir"""
+        return self._sql_store().window_stats(time.time() - seconds)
+    
+    def get_tool_stats(self, tool: str = None, seconds: float = None) -> List[Dict[str, Any]]:
+        """Statistik per tool, seumur hidup atau dalam `seconds` terakhir"""
+        since = time.time() - seconds if seconds is not None else None
+        return self._sql_store().tool_stats(tool, since=since)
+    
+    def get_slowest_tasks(self, limit: int = 10, seconds: float = None) -> List[Dict[str, Any]]:
+        """Task dengan durasi eksekusi terlama, opsional dalam `seconds` terakhir"""
+        since = time.time() - seconds if seconds is not None else None
+        return self._sql_store().slowest_tasks(limit, since=since)
+    
+    def iter_history(self) -> Iterator[Dict[str, Any]]:
+        """Stream execution history dari disk, terlama lebih dulu"""
+        self.flush()
+        return iter(self.log)
+    
+    def flush(self, timeout: float = None) -> bool:
+        """Tunggu sampai semua record di antrian tertulis ke disk"""
+        if self.writer:
+            return self.writer.flush(timeout)
+        return True
+    
+    def close(self):
+        """Tutup log dan pastikan semua data tersimpan ke disk"""
+        if self.writer:
+            self.writer.close()
+            atexit.unregister(self.close)
+        self.log.close()
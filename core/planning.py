@@ -3,125 +3,581 @@ Planning Module
 File: core/planning.py
 """
 
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Iterator, NamedTuple, Optional, Tuple
+from array import array
+from collections import OrderedDict
 from datetime import datetime
+import logging
+import threading
+from config.settings import settings
+from memory.history import BoundedHistory
+from utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class PlanValidationError(ValueError):
+    """Plan memiliki dependency yang tidak ada atau dependency melingkar"""
+    pass
+
+
+# Status step disimpan sebagai kode integer; nama hanya dipakai di API/serialisasi
+PENDING, IN_PROGRESS, COMPLETED, FAILED, TIMED_OUT, CANCELLED = range(6)
+STATUS_NAMES: Tuple[str, ...] = ("pending", "in_progress", "completed", "failed", "timed_out",
+                                 "cancelled")
+STATUS_CODES: Dict[str, int] = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+
+class StepInput(NamedTuple):
+    """Data edge: parameter step diisi dari hasil step lain
+    
+    Nilainya adalah field "result" dari output tool step sumber, atau
+    `result[key]` jika key diisi. Objek diteruskan apa adanya (tanpa copy),
+    jadi bytes/memoryview sampai ke tool tujuan sebagai buffer yang sama.
+    """
+    step_id: int
+    key: Optional[str] = None
 
 
 class Step:
-    """Representasi satu langkah dalam plan"""
+    """Representasi satu langkah dalam plan
+    
+    Memakai __slots__ dan kode status integer supaya plan dengan ribuan
+    step tetap ringan. started_at / completed_at berisi time.monotonic().
+    `params` adalah kwargs tetap untuk tool; `inputs` memetakan nama
+    parameter ke StepInput (step sumber otomatis menjadi dependency).
+    """
+    
+    __slots__ = ("step_id", "description", "tool", "params", "inputs", "_deps", "_code",
+                 "_plan", "_pos", "result", "error", "started_at", "completed_at")
     
     def __init__(self, step_id: int, description: str, tool: str = None, 
-                 dependencies: List[int] = None):
+                 dependencies: List[int] = None, params: Dict[str, Any] = None,
+                 inputs: Dict[str, Any] = None):
         self.step_id = step_id
         self.description = description
         self.tool = tool
-        self.dependencies = dependencies or []
-        self.status = "pending"  # pending, in_progress, completed, failed
+        self.params = params
+        # Shorthand {"text": 1} sama dengan {"text": StepInput(1)}
+        self.inputs: Optional[Dict[str, StepInput]] = {
+            name: ref if isinstance(ref, StepInput) else StepInput(ref)
+            for name, ref in inputs.items()
+        } if inputs else None
+        
+        deps = tuple(dependencies) if dependencies else ()
+        if self.inputs:
+            deps = tuple(dict.fromkeys(deps + tuple(ref.step_id for ref in self.inputs.values())))
+        self._deps: Tuple[int, ...] = deps
+        self._code = PENDING
+        self._plan: Optional["Plan"] = None
+        self._pos = -1
         self.result = None
         self.error = None
-        self.started_at = None
-        self.completed_at = None
+        self.started_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+    
+    @property
+    def dependencies(self) -> List[int]:
+        return list(self._deps)
+    
+    @property
+    def status(self) -> str:
+        return STATUS_NAMES[self._code]
+    
+    @status.setter
+    def status(self, value: str):
+        code = STATUS_CODES.get(value)
+        if code is None:
+            raise ValueError(f"Unknown step status: {value}")
+        
+        old = self._code
+        if old == code:
+            return
+        self._code = code
+        # Beritahu plan supaya ready queue tetap up to date
+        if self._plan is not None:
+            self._plan._on_status_change(self, old, code)
+    
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None or self.completed_at is None:
+            return None
+        return self.completed_at - self.started_at
     
     def to_dict(self) -> Dict:
         return {
             "step_id": self.step_id,
             "description": self.description,
             "tool": self.tool,
-            "dependencies": self.dependencies,
-            "status": self.status
+            "dependencies": list(self._deps),
+            "status": STATUS_NAMES[self._code]
         }
 
 
 class Plan:
-    """Representasi plan lengkap"""
+    """Representasi plan lengkap
+    
+    Plan menyimpan index step_id -> Step, graph dependents dalam bentuk CSR
+    (array offset + target per posisi step), jumlah dependency yang belum
+    selesai per step, dan ready queue yang diperbarui setiap kali status
+    step berubah. Lookup step O(1) dan biaya scheduling sebanding dengan
+    jumlah edge dependency.
+    """
     
     def __init__(self, task: str):
         self.task = task
         self.steps: List[Step] = []
         self.created_at = datetime.now().isoformat()
         self.status = "created"
+        # Diisi Planner dari cost model (lihat estimate_latency)
+        self.estimated_latency: Optional[float] = None
+        self.critical_path: Tuple[int, ...] = ()
+        
+        self._index: Dict[int, Step] = {}
+        # Dependents step di posisi i: _targets[_offsets[i]:_offsets[i + 1]].
+        # Dibangun saat dibutuhkan; plan dari template memakai array template.
+        self._offsets: Optional[array] = None
+        self._targets: Optional[array] = None
+        self._unmet = array("i")
+        self._codes = bytearray()
+        self._ready: Dict[int, Step] = {}  # ordered set of ready steps
+        self._status_counts = [0] * len(STATUS_NAMES)
+        # Bentuk step (StepTemplate) untuk PlanSnapshot
+        self._shape: Optional[Tuple["StepTemplate", ...]] = None
+        self._templated = False
+        self._validated = False
+        self._lock = threading.RLock()
     
     def add_step(self, step: Step):
-        self.steps.append(step)
+        with self._lock:
+            if step.step_id in self._index:
+                raise PlanValidationError(f"Duplicate step id: {step.step_id}")
+            
+            step._pos = len(self.steps)
+            step._plan = self
+            self.steps.append(step)
+            self._index[step.step_id] = step
+            self._offsets = self._targets = None
+            self._shape = None
+            self._validated = False
+            self._codes.append(step._code)
+            self._status_counts[step._code] += 1
+            
+            unmet = 0
+            for dep_id in step._deps:
+                dep = self._index.get(dep_id)
+                if dep is None or dep._code != COMPLETED:
+                    unmet += 1
+            self._unmet.append(unmet)
+            
+            if unmet == 0 and step._code == PENDING:
+                self._ready[step.step_id] = step
+            
+            if step._code == COMPLETED:
+                self._release_dependents(step)
     
-    def get_step(self, step_id: int) -> Step:
+    def _ensure_graph(self):
+        """Bangun array CSR dependents dari daftar dependency tiap step"""
+        if self._offsets is not None:
+            return
+        
+        index = self._index
+        offsets = array("i", [0]) * (len(self.steps) + 1)
         for step in self.steps:
-            if step.step_id == step_id:
-                return step
-        return None
+            for dep_id in step._deps:
+                dep = index.get(dep_id)
+                if dep is not None:
+                    offsets[dep._pos + 1] += 1
+        for pos in range(len(self.steps)):
+            offsets[pos + 1] += offsets[pos]
+        
+        targets = array("i", [0]) * offsets[-1]
+        fill = offsets[:-1]
+        for step in self.steps:
+            for dep_id in step._deps:
+                dep = index.get(dep_id)
+                if dep is not None:
+                    targets[fill[dep._pos]] = step._pos
+                    fill[dep._pos] += 1
+        
+        self._offsets, self._targets = offsets, targets
+    
+    def _dependents(self, step: Step) -> Iterator[Step]:
+        self._ensure_graph()
+        steps, targets = self.steps, self._targets
+        for i in range(self._offsets[step._pos], self._offsets[step._pos + 1]):
+            yield steps[targets[i]]
+    
+    def data_consumers(self) -> Dict[int, List[int]]:
+        """step sumber -> step yang memakai hasilnya lewat StepInput"""
+        consumers: Dict[int, List[int]] = {}
+        for step in self.steps:
+            if step.inputs:
+                for source in dict.fromkeys(ref.step_id for ref in step.inputs.values()):
+                    consumers.setdefault(source, []).append(step.step_id)
+        return consumers
+    
+    def get_step(self, step_id: int) -> Optional[Step]:
+        return self._index.get(step_id)
     
     def get_next_steps(self) -> List[Step]:
         """Dapatkan steps yang siap dieksekusi (dependencies terpenuhi)"""
-        ready_steps = []
+        with self._lock:
+            return list(self._ready.values())
+    
+    def count_status(self, status: str) -> int:
+        """Jumlah step dengan status tertentu - O(1)"""
+        code = STATUS_CODES.get(status)
+        return self._status_counts[code] if code is not None else 0
+    
+    def _on_status_change(self, step: Step, old: int, new: int):
+        with self._lock:
+            self._status_counts[old] -= 1
+            self._status_counts[new] += 1
+            self._codes[step._pos] = new
+            
+            if old == PENDING:
+                self._ready.pop(step.step_id, None)
+            elif new == PENDING and self._unmet[step._pos] == 0:
+                self._ready[step.step_id] = step
+            
+            if new == COMPLETED:
+                self._release_dependents(step)
+            elif old == COMPLETED:
+                # Step dijalankan ulang: dependents kembali menunggu
+                for dependent in self._dependents(step):
+                    self._unmet[dependent._pos] += 1
+                    self._ready.pop(dependent.step_id, None)
+    
+    def _release_dependents(self, step: Step):
+        for dependent in self._dependents(step):
+            self._unmet[dependent._pos] -= 1
+            if self._unmet[dependent._pos] == 0 and dependent._code == PENDING:
+                self._ready[dependent.step_id] = dependent
+    
+    def validate(self):
+        """Cek dependency yang hilang dan siklus (Kahn's algorithm)
         
-        for step in self.steps:
-            if step.status != "pending":
-                continue
+        Raises:
+            PlanValidationError: jika plan tidak bisa dieksekusi
+        """
+        if self._validated:
+            return
+        
+        with self._lock:
+            for step in self.steps:
+                for dep_id in step._deps:
+                    if dep_id not in self._index:
+                        raise PlanValidationError(
+                            f"Step {step.step_id} depends on missing step {dep_id}"
+                        )
             
-            # Check if all dependencies are completed
-            dependencies_met = all(
-                self.get_step(dep_id).status == "completed"
-                for dep_id in step.dependencies
-            )
+            self._ensure_graph()
+            offsets, targets = self._offsets, self._targets
+            in_degree = array("i", (len(step._deps) for step in self.steps))
+            queue = [pos for pos, degree in enumerate(in_degree) if degree == 0]
+            visited = 0
+            
+            while queue:
+                pos = queue.pop()
+                visited += 1
+                for i in range(offsets[pos], offsets[pos + 1]):
+                    target = targets[i]
+                    in_degree[target] -= 1
+                    if in_degree[target] == 0:
+                        queue.append(target)
+            
+            if visited < len(self.steps):
+                cyclic = sorted(
+                    self.steps[pos].step_id for pos, degree in enumerate(in_degree) if degree > 0
+                )
+                raise PlanValidationError(
+                    f"Dependency cycle between steps: {', '.join(map(str, cyclic))}"
+                )
             
-            if dependencies_met:
-                ready_steps.append(step)
+            self._validated = True
+    
+    def estimate_latency(self, step_cost: Callable[[Step], float]) -> float:
+        """Estimasi latency plan = jalur dependency dengan total biaya terbesar
         
-        return ready_steps
+        Step dengan dependency yang sama bisa berjalan paralel, jadi yang
+        menentukan durasi hanya critical path. Mengisi estimated_latency
+        dan critical_path (step_id dari awal sampai akhir).
+        """
+        with self._lock:
+            self._ensure_graph()
+            steps, offsets, targets = self.steps, self._offsets, self._targets
+            cost = [step_cost(step) for step in steps]
+            start = [0.0] * len(steps)
+            finish = [0.0] * len(steps)
+            parent = [-1] * len(steps)
+            in_degree = array("i", (len(step._deps) for step in steps))
+            queue = [pos for pos, degree in enumerate(in_degree) if degree == 0]
+            
+            while queue:
+                pos = queue.pop()
+                finish[pos] = start[pos] + cost[pos]
+                for i in range(offsets[pos], offsets[pos + 1]):
+                    target = targets[i]
+                    if parent[target] < 0 or finish[pos] > start[target]:
+                        start[target] = finish[pos]
+                        parent[target] = pos
+                    in_degree[target] -= 1
+                    if in_degree[target] == 0:
+                        queue.append(target)
+            
+            path = []
+            if steps:
+                # Seri: ambil step paling akhir supaya step gratis di ujung ikut
+                pos = max(range(len(steps)), key=lambda pos: (finish[pos], pos))
+                self.estimated_latency = finish[pos]
+                while pos >= 0:
+                    path.append(steps[pos].step_id)
+                    pos = parent[pos]
+            else:
+                self.estimated_latency = 0.0
+            self.critical_path = tuple(reversed(path))
+            return self.estimated_latency
+    
+    @property
+    def duration(self) -> Optional[float]:
+        """Detik dari step pertama mulai sampai step terakhir selesai"""
+        started = [step.started_at for step in self.steps if step.started_at is not None]
+        completed = [step.completed_at for step in self.steps if step.completed_at is not None]
+        if not started or not completed:
+            return None
+        return max(completed) - min(started)
+    
+    def snapshot(self) -> "PlanSnapshot":
+        """View read-only atas state plan saat ini; dict dibuat saat to_dict()"""
+        with self._lock:
+            if self._shape is None:
+                self._shape = tuple(
+                    StepTemplate(step.step_id, step.description, step.tool, step._deps)
+                    for step in self.steps
+                )
+                self._templated = False
+            return PlanSnapshot(self)
     
     def to_dict(self) -> Dict:
+        return self.snapshot().to_dict()
+
+
+class PlanSnapshot:
+    """Salinan ringan state plan untuk history
+    
+    Hanya menyimpan referensi ke bentuk step (dibagi dengan template) dan
+    satu byte status per step; tidak menahan Step maupun hasil tool.
+    """
+    
+    __slots__ = ("task", "created_at", "status", "estimated_latency", "critical_path",
+                 "_shape", "_codes", "_templated")
+    
+    def __init__(self, plan: Plan):
+        self.task = plan.task
+        self.created_at = plan.created_at
+        self.status = plan.status
+        self.estimated_latency = plan.estimated_latency
+        self.critical_path = plan.critical_path
+        self._shape = plan._shape
+        self._codes = bytes(plan._codes)
+        self._templated = plan._templated
+    
+    def __len__(self) -> int:
+        return len(self._codes)
+    
+    def count_status(self, status: str) -> int:
+        code = STATUS_CODES.get(status)
+        return self._codes.count(code) if code is not None else 0
+    
+    def to_dict(self) -> Dict:
+        placeholder, task, names = PlanTemplate.TASK_PLACEHOLDER, self.task, STATUS_NAMES
+        templated = self._templated
+        steps = [
+            {
+                "step_id": step_id,
+                "description": description.replace(placeholder, task) if templated else description,
+                "tool": tool,
+                "dependencies": list(dependencies),
+                "status": names[code]
+            }
+            for (step_id, description, tool, dependencies), code in zip(self._shape, self._codes)
+        ]
         return {
             "task": self.task,
             "created_at": self.created_at,
             "status": self.status,
-            "steps": [step.to_dict() for step in self.steps]
+            "estimated_latency": self.estimated_latency,
+            "critical_path": list(self.critical_path),
+            "steps": steps
         }
 
 
+class StepTemplate(NamedTuple):
+    """Spesifikasi step immutable di dalam PlanTemplate"""
+    step_id: int
+    description: str  # boleh berisi placeholder {task}
+    tool: Optional[str]
+    dependencies: Tuple[int, ...]
+
+
+class PlanTemplate:
+    """Bentuk plan yang sudah dikompilasi untuk satu signature
+    
+    Template divalidasi sekali saat kompilasi; setiap instance hanya
+    berbeda pada teks task dan state per-step.
+    """
+    
+    TASK_PLACEHOLDER = "{task}"
+    
+    def __init__(self, signature: Tuple, steps: Tuple[StepTemplate, ...]):
+        self.signature = signature
+        self.steps = steps
+        
+        # Validasi bentuk plan sekali saja; array CSR dan state awal
+        # prototype dibagi/di-copy ke setiap instance
+        self._prototype = self._build("")
+        self._prototype.validate()
+    
+    def _build(self, task: str) -> Plan:
+        plan = Plan(task)
+        for spec in self.steps:
+            plan.add_step(Step(
+                spec.step_id,
+                spec.description.replace(self.TASK_PLACEHOLDER, task),
+                tool=spec.tool,
+                dependencies=spec.dependencies
+            ))
+        return plan
+    
+    def instantiate(self, task: str) -> Plan:
+        """Buat plan baru dari template tanpa membangun ulang graph"""
+        prototype = self._prototype
+        plan = Plan(task)
+        
+        for pos, spec in enumerate(self.steps):
+            step = Step(
+                spec.step_id,
+                spec.description.replace(self.TASK_PLACEHOLDER, task),
+                tool=spec.tool,
+                dependencies=spec.dependencies
+            )
+            step._pos = pos
+            step._plan = plan
+            plan.steps.append(step)
+            plan._index[spec.step_id] = step
+        
+        # Array CSR read-only dipakai bersama; state per-instance di-copy
+        plan._offsets = prototype._offsets
+        plan._targets = prototype._targets
+        plan._unmet = array("i", prototype._unmet)
+        plan._codes = bytearray(prototype._codes)
+        plan._status_counts = list(prototype._status_counts)
+        plan._ready = {step_id: plan._index[step_id] for step_id in prototype._ready}
+        plan._shape = self.steps
+        plan._templated = True
+        plan._validated = True
+        return plan
+
+
 class Planner:
     """Modul untuk membuat execution plan"""
     
-    def __init__(self):
-        self.plans: List[Plan] = []
+    def __init__(self, max_plans: int = None, max_templates: int = None,
+                 spill_dir: str = None, cost_model=None):
+        # Riwayat plan dibatasi; plan lama di-spill ke disk sebagai dict (jika spill_dir)
+        self.plans = BoundedHistory(
+            max_plans or settings.PLANNER_HISTORY_SIZE,
+            spill_dir=spill_dir,
+            serialize=Plan.to_dict
+        )
+        self.templates: "OrderedDict[Tuple, PlanTemplate]" = OrderedDict()
+        self.max_templates = max_templates or settings.PLANNER_TEMPLATE_CACHE_SIZE
+        # Opsional (core/cost_model.CostModel): pilih/urutkan tool dari statistik
+        self.cost_model = cost_model
     
     def create_plan(self, task: str, analysis: Dict[str, Any]) -> Plan:
         """Buat plan berdasarkan task analysis"""
-        print(f"📋 [Planner] Creating execution plan...")
+        complexity = analysis.get("complexity", "simple")
+        required_tools = tuple(analysis.get("requires_tools", []))
+        if self.cost_model is not None:
+            required_tools = self._rank_tools(complexity, required_tools)
         
-        plan = Plan(task)
+        template = self.get_template(complexity, required_tools)
+        plan = template.instantiate(task)
         
-        # Simple rule-based planning
-        complexity = analysis.get("complexity", "simple")
-        required_tools = analysis.get("requires_tools", [])
+        plan.status = "ready"
+        self.plans.append(plan)
+        
+        if self.cost_model is not None:
+            plan.estimate_latency(self.cost_model.step_latency)
+            logger.info("📋 [Planner] Created plan with %d steps (estimated %.3fs)",
+                        len(plan.steps), plan.estimated_latency)
+        else:
+            logger.info("📋 [Planner] Created plan with %d steps", len(plan.steps))
+        if logger.isEnabledFor(logging.DEBUG):
+            for step in plan.steps:
+                logger.debug("   Step %s: %s", step.step_id, step.description)
+        
+        return plan
+    
+    def _rank_tools(self, complexity: str, required_tools: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Ganti tiap kebutuhan dengan tool termurah, lalu urutkan berdasarkan biaya"""
+        resolved = tuple(dict.fromkeys(self.cost_model.resolve(tool) for tool in required_tools))
+        if complexity == "simple":
+            # Plan satu step: hanya tool pertama yang dipakai
+            return resolved
+        return tuple(self.cost_model.order(resolved))
+    
+    def iter_plans(self) -> Iterator[Dict[str, Any]]:
+        """Iterasi seluruh plan (termasuk yang sudah di-spill) sebagai dict"""
+        return self.plans.iter_all()
+    
+    def close(self):
+        self.plans.close()
+    
+    def get_template(self, complexity: str, required_tools: Tuple[str, ...]) -> PlanTemplate:
+        """Ambil template untuk signature, kompilasi jika belum ada"""
+        signature = (complexity, required_tools)
+        
+        template = self.templates.get(signature)
+        if template is not None:
+            self.templates.move_to_end(signature)
+            return template
+        
+        template = PlanTemplate(signature, self._compile_steps(complexity, required_tools))
+        self.templates[signature] = template
+        if len(self.templates) > self.max_templates:
+            self.templates.popitem(last=False)
+        return template
+    
+    def _compile_steps(self, complexity: str,
+                       required_tools: Tuple[str, ...]) -> Tuple[StepTemplate, ...]:
+        """Simple rule-based planning"""
+        task = PlanTemplate.TASK_PLACEHOLDER
+        steps = []
         
         if complexity == "simple":
             # Single step plan
             tool = required_tools[0] if required_tools else None
-            plan.add_step(Step(1, task, tool=tool))
+            steps.append(StepTemplate(1, task, tool, ()))
         
         elif complexity == "moderate":
             # Multi-step plan
             for i, tool in enumerate(required_tools, 1):
                 description = f"Execute {tool} for: {task}"
-                dependencies = [i-1] if i > 1 else []
-                plan.add_step(Step(i, description, tool=tool, dependencies=dependencies))
+                dependencies = (i-1,) if i > 1 else ()
+                steps.append(StepTemplate(i, description, tool, dependencies))
         
         else:  # complex
             # Detailed multi-step plan
-            plan.add_step(Step(1, "Understand and break down the task"))
+            steps.append(StepTemplate(1, "Understand and break down the task", None, ()))
             
             for i, tool in enumerate(required_tools, 2):
-                description = f"Execute {tool}"
-                plan.add_step(Step(i, description, tool=tool, dependencies=[i-1]))
+                steps.append(StepTemplate(i, f"Execute {tool}", tool, (i-1,)))
             
             final_step = len(required_tools) + 2
-            plan.add_step(Step(final_step, "Synthesize results", dependencies=[final_step-1]))
+            steps.append(StepTemplate(final_step, "Synthesize results", None, (final_step-1,)))
         
-        plan.status = "ready"
-        self.plans.append(plan)
-        
-        print(f"   Created plan with {len(plan.steps)} steps")
-        for step in plan.steps:
-            print(f"   Step {step.step_id}: {step.description}")
-        
-        return plan
+        return tuple(steps)
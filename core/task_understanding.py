@@ -3,45 +3,191 @@ Task Understanding Module
 File: core/task_understanding.py
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Set, Tuple
 from datetime import datetime
+import hashlib
+import logging
+import re
+from tools.cache import ResultCache
+from config.settings import settings
+from utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Kata yang menandakan task multi-langkah
+COMPLEXITY_INDICATORS = [
+    "then", "after", "before", "if", "when", "multiple",
+    "calculate", "analyze", "compare", "find"
+]
+
+# Tool detection patterns: tool family -> keywords (urutan = prioritas)
+TOOL_FAMILIES = {
+    "calculator": ["calculate", "compute", "math", "add", "multiply"],
+    "file_operation": ["file", "read", "write", "save", "load"],
+    "text_analysis": ["analyze text", "count words", "statistics"],
+    "web_search": ["search", "find online", "web"],
+    "database": ["database", "query", "sql"]
+}
+
+
+class KeywordMatcher:
+    """Keyword matcher single-pass berbasis satu regex gabungan
+    
+    Semua keyword dikompilasi sekali menjadi satu alternation dengan word
+    boundary. Keyword multi-kata juga membawa label dari keyword lain yang
+    ada di dalamnya (mis. "analyze text" juga menghasilkan "analyze"),
+    sehingga satu scan cukup untuk mendapatkan semua hit.
+    """
+    
+    def __init__(self):
+        self._labels: Dict[str, List[Tuple[str, str]]] = {}
+        self._closure: Dict[str, List[Tuple[str, str]]] = {}
+        self._pattern = None
+    
+    def add(self, kind: str, label: str, keywords: Iterable[str]):
+        """Daftarkan keyword untuk (kind, label)"""
+        for keyword in keywords:
+            keyword = " ".join(keyword.lower().split())
+            if keyword:
+                self._labels.setdefault(keyword, []).append((kind, label))
+        self._pattern = None
+    
+    def _compile(self):
+        closure = {}
+        for keyword, labels in self._labels.items():
+            words = keyword.split(" ")
+            expanded = list(labels)
+            # Sub-frasa kontigu yang juga merupakan keyword
+            for i in range(len(words)):
+                for j in range(i + 1, len(words) + 1):
+                    sub = " ".join(words[i:j])
+                    if sub != keyword and sub in self._labels:
+                        expanded.extend(self._labels[sub])
+            closure[keyword] = expanded
+        
+        # Terpanjang dulu supaya frasa menang atas kata tunggal di posisi sama
+        alternation = "|".join(
+            re.escape(keyword).replace(r"\ ", r"\s+")
+            for keyword in sorted(self._labels, key=len, reverse=True)
+        )
+        self._closure = closure
+        self._pattern = re.compile(r"\b(?=(" + alternation + r")\b)", re.IGNORECASE)
+    
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """Scan text sekali; return {kind: set(label)}"""
+        if self._pattern is None:
+            self._compile()
+        
+        hits: Dict[str, Set[str]] = {}
+        if not self._labels:
+            return hits
+        
+        for match in self._pattern.finditer(text):
+            keyword = " ".join(match.group(1).lower().split())
+            for kind, label in self._closure[keyword]:
+                hits.setdefault(kind, set()).add(label)
+        return hits
 
 
 class TaskUnderstanding:
     """Modul untuk memahami dan menganalisis task"""
     
-    def __init__(self, llm_client=None):
+    def __init__(self, llm_client=None, tool_manager=None, cache: ResultCache = None):
         self.client = llm_client
+        self.tool_manager = tool_manager
+        
+        self.cache = cache or ResultCache(
+            max_size=settings.ANALYSIS_CACHE_SIZE,
+            ttl=settings.ANALYSIS_CACHE_TTL,
+            persist_dir=(settings.CACHE_DIR / "analysis"
+                         if settings.ANALYSIS_CACHE_PERSISTENT else None)
+        )
+        self.registry_version = 0
+        
+        self.matcher = KeywordMatcher()
+        for indicator in COMPLEXITY_INDICATORS:
+            self.matcher.add("indicator", indicator, [indicator])
+        
+        self.tool_families: Dict[str, List[str]] = {}
+        self._family_order: Dict[str, int] = {}
+        for name, keywords in TOOL_FAMILIES.items():
+            self.register_tool_family(name, keywords)
+    
+    def register_tool_family(self, name: str, keywords: Iterable[str]):
+        """Daftarkan keyword untuk mendeteksi kebutuhan sebuah tool"""
+        keywords = list(keywords)
+        self.tool_families.setdefault(name, []).extend(keywords)
+        self._family_order.setdefault(name, len(self._family_order))
+        self.matcher.add("tool", name, keywords)
+        self.registry_version += 1
+    
+    @staticmethod
+    def normalize_task(task: str) -> str:
+        """Normalisasi whitespace dan huruf besar/kecil untuk cache key"""
+        return " ".join(task.lower().split())
+    
+    def _model_name(self) -> str:
+        if self.client is None:
+            return "rules"
+        return getattr(self.client, "model", None) or settings.DEFAULT_MODEL
+    
+    def _cache_key(self, task: str) -> str:
+        tool_version = self.tool_manager.version if self.tool_manager is not None else 0
+        raw = "|".join([
+            self._model_name(),
+            f"{self.registry_version}.{tool_version}",
+            self.normalize_task(task)
+        ])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
     
     def analyze(self, task: str) -> Dict[str, Any]:
         """Analisis task dan ekstrak informasi penting"""
-        print(f"🧠 [TaskUnderstanding] Analyzing task...")
+        key = self._cache_key(task)
+        found, cached = self.cache.get(key)
+        if found:
+            logger.info("🧠 [TaskUnderstanding] Using cached analysis (complexity: %s)",
+                        cached["complexity"])
+            return {
+                **cached,
+                "original_task": task,
+                "requires_tools": list(cached["requires_tools"]),
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        analysis = self._analyze(task)
+        self.cache.set(key, analysis)
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🧠 [TaskUnderstanding] Complexity: %s, potential tools: %s",
+                        analysis["complexity"],
+                        ", ".join(analysis["requires_tools"]) or "None detected")
+        
+        return {**analysis, "requires_tools": list(analysis["requires_tools"])}
+    
+    def _analyze(self, task: str) -> Dict[str, Any]:
+        """Analisis rule-based (tanpa cache)"""
+        hits = self.matcher.scan(task)
+        indicator_count = len(hits.get("indicator", ()))
+        complexity = self._assess_complexity(len(task.split()), indicator_count)
         
         analysis = {
             "original_task": task,
-            "complexity": self._assess_complexity(task),
-            "requires_tools": self._detect_tool_needs(task),
-            "estimated_steps": self._estimate_steps(task),
+            "complexity": complexity,
+            "requires_tools": self._detect_tool_needs(hits),
+            "estimated_steps": self._estimate_steps(complexity),
             "timestamp": datetime.now().isoformat()
         }
         
-        print(f"   Complexity: {analysis['complexity']}")
-        print(f"   Potential tools: {', '.join(analysis['requires_tools']) if analysis['requires_tools'] else 'None detected'}")
-        
         return analysis
     
-    def _assess_complexity(self, task: str) -> str:
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Statistik analysis cache (hits, misses, evictions)"""
+        return self.cache.stats()
+    
+    def _assess_complexity(self, word_count: int, indicator_count: int) -> str:
         """Estimasi kompleksitas task"""
-        word_count = len(task.split())
-        
-        # Count complexity indicators
-        complexity_indicators = [
-            "then", "after", "before", "if", "when", "multiple",
-            "calculate", "analyze", "compare", "find"
-        ]
-        
-        indicator_count = sum(1 for word in complexity_indicators if word in task.lower())
-        
         if word_count < 10 and indicator_count == 0:
             return "simple"
         elif word_count < 30 and indicator_count < 3:
@@ -49,33 +195,12 @@ class TaskUnderstanding:
         else:
             return "complex"
     
-    def _detect_tool_needs(self, task: str) -> list:
-        """Deteksi tools yang mungkin dibutuhkan"""
-        task_lower = task.lower()
-        tools = []
-        
-        # Tool detection patterns
-        if any(word in task_lower for word in ["calculate", "compute", "math", "add", "multiply"]):
-            tools.append("calculator")
-        
-        if any(word in task_lower for word in ["file", "read", "write", "save", "load"]):
-            tools.append("file_operation")
-        
-        if any(word in task_lower for word in ["analyze text", "count words", "statistics"]):
-            tools.append("text_analysis")
-        
-        if any(word in task_lower for word in ["search", "find online", "web"]):
-            tools.append("web_search")
-        
-        if any(word in task_lower for word in ["database", "query", "sql"]):
-            tools.append("database")
-        
-        return tools
+    def _detect_tool_needs(self, hits: Dict[str, Set[str]]) -> list:
+        """Deteksi tools yang mungkin dibutuhkan, urut sesuai registrasi"""
+        return sorted(hits.get("tool", ()), key=self._family_order.__getitem__)
     
-    def _estimate_steps(self, task: str) -> int:
+    def _estimate_steps(self, complexity: str) -> int:
         """Estimasi jumlah langkah yang dibutuhkan"""
-        complexity = self._assess_complexity(task)
-        
         if complexity == "simple":
             return 1
         elif complexity == "moderate":
@@ -4,9 +4,6 @@ File: main.py
 """
 
 from core.agent import AgenticSystem
-from tools.calculator import CalculatorTool
-from tools.file_operations import FileOperationTool
-from tools.text_analysis import TextAnalysisTool
 from config.settings import settings
 import json
 
@@ -20,11 +17,9 @@ def main():
     # Initialize the agentic system
     agent = AgenticSystem()
     
-    # Register tools
+    # Register tools (modul tool di-import saat pertama kali dipakai)
     print("\n📦 Registering tools...")
-    agent.register_tool(CalculatorTool())
-    agent.register_tool(FileOperationTool())
-    agent.register_tool(TextAnalysisTool())
+    agent.register_default_tools()
     
     print("\n" + "="*60)
     print("🤖 AI Agentic System Ready!")
@@ -51,6 +46,9 @@ def main():
     stats = agent.get_statistics()
     print(json.dumps(stats, indent=2))
     
+    # Flush pending learning records before exit
+    agent.close()
+    
     print("\n" + "="*60)
     print("🎉 Demo completed successfully!")
     print("="*60)
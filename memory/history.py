@@ -0,0 +1,129 @@
+"""
+Bounded History with Spill-to-Disk
+File: memory/history.py
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+import os
+import shutil
+import tempfile
+import threading
+from memory.segmented_log import SegmentedLog
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Ada tapi milik user lain (PermissionError) atau tidak bisa dicek
+        return True
+    return True
+
+
+class BoundedHistory:
+    """Ring buffer N entry terbaru; entry yang tergeser ditulis ke SegmentedLog
+    
+    Iterasi biasa (`for item in history`, `len()`) hanya mencakup entry di
+    memory. `iter_all()` men-stream entry yang sudah di-spill lalu entry di
+    memory, dalam bentuk dict hasil `serialize`.
+    
+    File spill hanya scratch space milik proses: setiap instance menulis
+    ke direktori `<pid>-*` sendiri yang dihapus saat close(). Direktori
+    milik proses yang sudah mati (crash, kill) dibersihkan saat spill
+    pertama, sehingga spill_dir tidak tumbuh antar restart.
+    """
+    
+    def __init__(self, max_items: int, spill_dir: str = None,
+                 serialize: Callable[[Any], Dict] = None, spill_batch: int = 64):
+        self.max_items = max_items
+        self.serialize = serialize or (lambda item: item)
+        self.spill_batch = spill_batch
+        
+        self._items: Deque[Any] = deque()
+        self._pending: List[Dict] = []
+        self._spill_root = Path(spill_dir) if spill_dir else None
+        self._spill_path: Optional[Path] = None
+        self._log: Optional[SegmentedLog] = None
+        self._lock = threading.Lock()
+        self.spilled = 0
+    
+    def append(self, item: Any):
+        with self._lock:
+            self._items.append(item)
+            if len(self._items) <= self.max_items:
+                return
+            
+            evicted = self._items.popleft()
+            if self._spill_root is None:
+                return
+            self._pending.append(self.serialize(evicted))
+            self.spilled += 1
+            if len(self._pending) >= self.spill_batch:
+                self._write_pending()
+    
+    def _write_pending(self):
+        if not self._pending:
+            return
+        if self._log is None:
+            # Direktori per-instance, dibuat saat spill pertama
+            self._spill_root.mkdir(parents=True, exist_ok=True)
+            self._remove_stale_dirs()
+            self._spill_path = Path(tempfile.mkdtemp(prefix=f"{os.getpid()}-",
+                                                     dir=self._spill_root))
+            self._log = SegmentedLog(self._spill_path)
+        self._log.append_many(self._pending)
+        self._pending = []
+    
+    def _remove_stale_dirs(self):
+        """Hapus direktori spill milik proses yang sudah tidak hidup"""
+        for path in self._spill_root.iterdir():
+            pid, sep, _ = path.name.partition("-")
+            if not path.is_dir() or not sep or not pid.isdigit():
+                continue
+            if int(pid) != os.getpid() and not _pid_alive(int(pid)):
+                shutil.rmtree(path, ignore_errors=True)
+    
+    def iter_all(self) -> Iterator[Dict]:
+        """Seluruh history (disk lalu memory), terlama lebih dulu"""
+        with self._lock:
+            self._write_pending()
+            log = self._log
+            recent = list(self._items)
+        
+        if log is not None:
+            yield from log
+        for item in recent:
+            yield self.serialize(item)
+    
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._items))
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __getitem__(self, index: int) -> Any:
+        return self._items[index]
+    
+    @property
+    def total(self) -> int:
+        """Jumlah entry di memory + yang sudah di-spill"""
+        return len(self._items) + self.spilled
+    
+    def clear(self):
+        """Kosongkan ring buffer (entry yang sudah di-spill tetap di disk)"""
+        with self._lock:
+            self._items.clear()
+    
+    def close(self):
+        """Hapus file spill milik instance ini"""
+        with self._lock:
+            self._pending = []
+            if self._log is not None:
+                self._log.close()
+                shutil.rmtree(self._spill_path, ignore_errors=True)
+                self._log = None
+            self.spilled = 0
@@ -0,0 +1,72 @@
+"""
+Intermediate Result Store
+File: memory/result_store.py
+"""
+
+from typing import Any, Dict, Iterable, Optional, Set
+import threading
+
+
+class ResultStore:
+    """Hasil antara step yang masih dibutuhkan step lain, dengan reference count
+    
+    Setiap hasil yang di-`put` dipegang sampai semua step konsumennya
+    memanggil `release`. Setelah itu referensinya dibuang, sehingga buffer
+    besar (mis. memoryview atas mmap) bisa dibebaskan segera dan puncak
+    memory hanya sebesar hasil yang masih "hidup" di dataflow.
+    """
+    
+    def __init__(self, consumers: Dict[int, Iterable[int]] = None):
+        # step sumber -> step konsumen yang belum selesai
+        self._consumers: Dict[int, Set[int]] = {
+            source: set(steps) for source, steps in (consumers or {}).items()
+        }
+        self._values: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+        self.peak = 0
+        self.freed = 0
+    
+    def wanted(self, step_id: int) -> bool:
+        """True jika masih ada konsumen yang menunggu hasil step ini"""
+        return bool(self._consumers.get(step_id))
+    
+    def put(self, step_id: int, value: Any) -> bool:
+        """Simpan hasil jika masih dibutuhkan; return False jika tidak disimpan"""
+        with self._lock:
+            if not self._consumers.get(step_id):
+                return False
+            self._values[step_id] = value
+            self.peak = max(self.peak, len(self._values))
+            return True
+    
+    def get(self, step_id: int, key: Optional[str] = None) -> Any:
+        """Ambil hasil (tanpa copy); KeyError jika tidak tersedia"""
+        with self._lock:
+            value = self._values[step_id]
+        if key is not None:
+            return value[key]
+        return value
+    
+    def release(self, consumer_id: int, sources: Iterable[int]):
+        """Konsumen selesai (berhasil, gagal atau timeout); idempotent"""
+        with self._lock:
+            for source in sources:
+                waiting = self._consumers.get(source)
+                if waiting is None:
+                    continue
+                waiting.discard(consumer_id)
+                if not waiting:
+                    del self._consumers[source]
+                    if source in self._values:
+                        del self._values[source]
+                        self.freed += 1
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    def clear(self):
+        """Buang semua hasil yang tersisa (konsumen yang tidak akan jalan)"""
+        with self._lock:
+            self.freed += len(self._values)
+            self._values.clear()
+            self._consumers.clear()
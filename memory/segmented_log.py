@@ -0,0 +1,282 @@
+"""
+Segmented Append-Only Log
+File: memory/segmented_log.py
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class SegmentedLog:
+    """Append-only JSON Lines log yang dipecah menjadi beberapa segment file"""
+
+    SEGMENT_PREFIX = "segment_"
+    SEGMENT_SUFFIX = ".jsonl"
+
+    def __init__(self, directory: str, max_segment_records: int = 10000,
+                 compact_every: int = 16):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.max_segment_records = max_segment_records
+        self.compact_every = compact_every
+
+        self._file = None
+        self._active_index = 0
+        self._active_records = 0
+        self._rolls_since_compaction = 0
+        self.corrupt_records = 0
+        self._lock = threading.RLock()
+
+        self._open_active_segment()
+
+    def _segment_path(self, index: int) -> Path:
+        return self.directory / f"{self.SEGMENT_PREFIX}{index:08d}{self.SEGMENT_SUFFIX}"
+
+    def segments(self) -> List[Path]:
+        """Daftar segment file, urut dari yang paling lama"""
+        return sorted(
+            self.directory.glob(f"{self.SEGMENT_PREFIX}*{self.SEGMENT_SUFFIX}"),
+            key=self._segment_range
+        )
+
+    def _segment_range(self, path: Path) -> Tuple[int, int]:
+        """Index (pertama, terakhir) yang dicakup sebuah segment"""
+        name = path.name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]
+        first, _, last = name.partition("-")
+        return int(first), int(last or first)
+
+    def _segment_index(self, path: Path) -> int:
+        return self._segment_range(path)[1]
+
+    def _open_active_segment(self):
+        """Buka segment terakhir untuk append, atau buat segment baru"""
+        self._recover_compaction()
+        existing = self.segments()
+
+        if existing:
+            self._active_index = self._segment_index(existing[-1])
+            path = existing[-1]
+            self._truncate_torn_tail(path)
+            self._active_records = self._count_records(path)
+        else:
+            self._active_index = 1
+            self._active_records = 0
+            path = self._segment_path(self._active_index)
+
+        if self._active_records >= self.max_segment_records:
+            self._active_index += 1
+            self._active_records = 0
+            path = self._segment_path(self._active_index)
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _recover_compaction(self):
+        """Selesaikan kompaksi yang terputus crash
+
+        Setelah os.replace, segment hasil kompaksi sudah lengkap; segment
+        sumber yang belum sempat di-unlink dihapus supaya record-nya tidak
+        terbaca dua kali. File .compact sisa crash sebelum replace dibuang.
+        """
+        for tmp_path in self.directory.glob(f"{self.SEGMENT_PREFIX}*.compact"):
+            tmp_path.unlink()
+
+        existing = self.segments()
+        compacted = [self._segment_range(p) for p in existing if "-" in p.name]
+        for path in existing:
+            if "-" in path.name:
+                continue
+            index = self._segment_index(path)
+            if any(first <= index <= last for first, last in compacted):
+                path.unlink()
+
+    def _truncate_torn_tail(self, path: Path):
+        """Buang baris terakhir yang tidak lengkap (crash di tengah write)"""
+        with open(path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            # Cari newline terakhir dan potong sisanya
+            position = size
+            block = 4096
+            while position > 0:
+                start = max(0, position - block)
+                f.seek(start)
+                chunk = f.read(position - start)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    f.truncate(start + newline + 1)
+                    self.corrupt_records += 1
+                    return
+                position = start
+
+            f.truncate(0)
+            self.corrupt_records += 1
+
+    def _count_records(self, path: Path) -> int:
+        count = 0
+        with open(path, 'rb') as f:
+            for _ in f:
+                count += 1
+        return count
+
+    def append(self, record: Dict[str, Any], sync: bool = False):
+        """Tambahkan satu record ke segment aktif - O(1)"""
+        self.append_many([record], sync=sync)
+
+    def append_many(self, records: List[Dict[str, Any]], sync: bool = False):
+        """Tambahkan beberapa record dengan satu write"""
+        if not records:
+            return
+
+        with self._lock:
+            lines = []
+            for record in records:
+                lines.append(json.dumps(record, separators=(",", ":"), default=str))
+                self._active_records += 1
+
+                if self._active_records >= self.max_segment_records:
+                    self._file.write("\n".join(lines) + "\n")
+                    lines = []
+                    self._roll(sync)
+
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+
+            self.flush(sync)
+
+    def flush(self, sync: bool = False):
+        """Flush buffer ke OS, opsional fsync ke disk"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def _roll(self, sync: bool):
+        """Tutup segment aktif dan mulai segment baru"""
+        self.flush(sync)
+        self._file.close()
+
+        self._active_index += 1
+        self._active_records = 0
+        self._file = open(self._segment_path(self._active_index), 'a', encoding='utf-8')
+
+        self._rolls_since_compaction += 1
+        if self.compact_every and self._rolls_since_compaction >= self.compact_every:
+            self._compact()
+
+    def compact(self):
+        """Gabungkan segment tertutup yang belum dikompaksi menjadi satu segment
+
+        Setiap record hanya ditulis ulang sekali, sehingga biaya kompaksi
+        tetap O(1) per record secara amortisasi.
+        """
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        self._rolls_since_compaction = 0
+        candidates = [
+            p for p in self.segments()
+            if self._segment_index(p) != self._active_index and "-" not in p.name
+        ]
+
+        if len(candidates) < 2:
+            return
+
+        first = self._segment_range(candidates[0])[0]
+        last = self._segment_range(candidates[-1])[1]
+        target = self.directory / (
+            f"{self.SEGMENT_PREFIX}{first:08d}-{last:08d}{self.SEGMENT_SUFFIX}"
+        )
+        tmp_path = target.with_suffix(".compact")
+
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            for path in candidates:
+                for record in self._read_segment(path):
+                    out.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+
+        os.replace(tmp_path, target)
+        for path in candidates:
+            path.unlink()
+
+    def position(self) -> Dict[str, int]:
+        """Posisi akhir log saat ini (segment aktif + byte offset)"""
+        with self._lock:
+            self.flush()
+            return {
+                "segment": self._active_index,
+                "offset": self._segment_path(self._active_index).stat().st_size
+            }
+
+    def tail(self, position: Dict[str, int]) -> Optional[Iterator[Dict[str, Any]]]:
+        """Record yang ditulis setelah `position` (dari position())
+
+        Return None jika posisi tidak bisa dipakai lagi (segment-nya sudah
+        dikompaksi atau log di-reset); caller harus membaca ulang dari awal.
+        """
+        self.flush()
+        index, offset = position["segment"], position["offset"]
+        later = []
+        start = None
+
+        for path in self.segments():
+            first, last = self._segment_range(path)
+            if first > index:
+                later.append(path)
+            elif first == last == index:
+                start = path
+            elif first <= index <= last:
+                return None
+
+        if start is None or start.stat().st_size < offset:
+            return None
+
+        def records():
+            yield from self._read_segment(start, offset)
+            for path in later:
+                yield from self._read_segment(path)
+
+        return records()
+
+    def _read_segment(self, path: Path, offset: int = 0) -> Iterator[Dict[str, Any]]:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn write: baris terakhir tidak lengkap
+                    self.corrupt_records += 1
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    self.corrupt_records += 1
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterasi semua record dari segment terlama ke terbaru"""
+        self.flush()
+        for path in self.segments():
+            yield from self._read_segment(path)
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def close(self, sync: bool = True):
+        with self._lock:
+            if self._file is not None:
+                self.flush(sync)
+                self._file.close()
+                self._file = None
@@ -0,0 +1,487 @@
+"""
+SQLite Learning Store
+File: memory/sqlite_store.py
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import math
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    task TEXT,
+    status TEXT,
+    success INTEGER NOT NULL,
+    total_steps INTEGER NOT NULL,
+    steps_failed INTEGER NOT NULL,
+    duration REAL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_executions_ts ON executions (ts, success, duration);
+CREATE INDEX IF NOT EXISTS idx_executions_duration ON executions (duration);
+CREATE INDEX IF NOT EXISTS idx_executions_status ON executions (status);
+
+CREATE TABLE IF NOT EXISTS steps (
+    execution_id INTEGER NOT NULL REFERENCES executions (id),
+    step_id INTEGER NOT NULL,
+    tool TEXT,
+    status TEXT,
+    PRIMARY KEY (execution_id, step_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_steps_tool ON steps (tool, status);
+
+CREATE TABLE IF NOT EXISTS tool_calls (
+    execution_id INTEGER NOT NULL REFERENCES executions (id),
+    ts REAL NOT NULL,
+    tool TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    execution_time REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_tool_ts ON tool_calls (tool, ts, success, execution_time);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_ts ON tool_calls (ts);
+
+-- Rollup seumur hidup, di-update di transaksi yang sama dengan insert
+CREATE TABLE IF NOT EXISTS execution_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total INTEGER NOT NULL,
+    successful INTEGER NOT NULL,
+    failed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tool_totals (
+    tool TEXT PRIMARY KEY,
+    uses INTEGER NOT NULL,
+    calls INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    total_time REAL NOT NULL,
+    time_count INTEGER NOT NULL,
+    max_time REAL
+);
+
+-- Rollup per jam: query rentang panjang membaca jam penuh dari sini dan
+-- hanya tepi rentang dari tabel mentah
+CREATE TABLE IF NOT EXISTS execution_hourly (
+    hour INTEGER PRIMARY KEY,
+    total INTEGER NOT NULL,
+    successful INTEGER NOT NULL,
+    duration_sum REAL NOT NULL,
+    duration_count INTEGER NOT NULL,
+    max_duration REAL
+);
+CREATE TABLE IF NOT EXISTS tool_hourly (
+    tool TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    calls INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    time_sum REAL NOT NULL,
+    time_count INTEGER NOT NULL,
+    max_time REAL,
+    PRIMARY KEY (tool, hour)
+) WITHOUT ROWID;
+"""
+
+HOUR = 3600
+
+SYNCHRONOUS = {"none": "OFF", "batched": "NORMAL", "per_record": "FULL"}
+
+
+def _epoch(timestamp: Optional[str]) -> float:
+    if not timestamp:
+        return time.time()
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def _rate(successes: int, total: int) -> str:
+    return f"{(successes / total * 100):.1f}%" if total else "N/A"
+
+
+def _max(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    if a is None:
+        return b
+    return a if b is None else max(a, b)
+
+
+def _add_aggregate(acc: List, count: int, successes: int, value: Optional[float]):
+    """acc = [count, successes, sum, value_count, max]"""
+    acc[0] += count
+    acc[1] += successes
+    if value is not None:
+        acc[2] += value
+        acc[3] += 1
+        acc[4] = _max(acc[4], value)
+
+
+def _split_window(since: float, until: Optional[float]) -> Tuple[List[Tuple[float, float]], Optional[Tuple]]:
+    """Bagi [since, until) menjadi tepi mentah dan rentang jam penuh (hour_from, hour_to)"""
+    first = math.ceil(since / HOUR)
+    if until is None:
+        return [(since, first * HOUR)], (first, None)
+    last = math.floor(until / HOUR)
+    if first >= last:
+        return [(since, until)], None
+    return [(since, first * HOUR), (last * HOUR, until)], (first, last)
+
+
+class SQLiteLearningStore:
+    """Backend learning berbasis sqlite3 (WAL) dengan query agregat SQL
+    
+    Interface append/append_many/position/tail/__iter__/close sama dengan
+    SegmentedLog, sehingga bisa dipakai LearningModule dan BackgroundWriter
+    tanpa perubahan.
+    """
+    
+    BACKEND = "sqlite"
+    
+    def __init__(self, path: str, durability: str = "batched"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.corrupt_records = 0
+        self._lock = threading.RLock()
+        
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={SYNCHRONOUS.get(durability, 'NORMAL')}")
+        self._conn.executescript(SCHEMA)
+    
+    # -- Write path -----------------------------------------------------
+    
+    def append(self, record: Dict[str, Any], sync: bool = False):
+        self.append_many([record], sync=sync)
+    
+    def append_many(self, records: List[Dict[str, Any]], sync: bool = False):
+        """Satu transaksi dan executemany per batch"""
+        if not records:
+            return
+        
+        tool_totals: Dict[str, List] = {}
+        hourly: Dict[int, List] = {}
+        tool_hourly: Dict[Tuple[str, int], List] = {}
+        successful = 0
+        
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for record in records:
+                    execution_id, ts, steps, calls = self._insert_execution(cursor, record)
+                    success = bool(record.get("success"))
+                    successful += success
+                    _add_aggregate(hourly.setdefault(int(ts // HOUR), [0, 0, 0.0, 0, None]),
+                                   1, success, (record.get("result") or {}).get("duration"))
+                    cursor.executemany(
+                        "INSERT OR REPLACE INTO steps VALUES (?, ?, ?, ?)", steps
+                    )
+                    cursor.executemany(
+                        "INSERT INTO tool_calls VALUES (?, ?, ?, ?, ?)", calls
+                    )
+                    
+                    for _, _, tool, _ in steps:
+                        if tool:
+                            tool_totals.setdefault(tool, [0, 0, 0, 0.0, 0, None])[0] += 1
+                    for _, _, tool, success, execution_time in calls:
+                        totals = tool_totals.setdefault(tool, [0, 0, 0, 0.0, 0, None])
+                        totals[1] += 1
+                        totals[2] += success
+                        if execution_time is not None:
+                            totals[3] += execution_time
+                            totals[4] += 1
+                            totals[5] = _max(totals[5], execution_time)
+                        _add_aggregate(
+                            tool_hourly.setdefault((tool, int(ts // HOUR)), [0, 0, 0.0, 0, None]),
+                            1, success, execution_time
+                        )
+                
+                cursor.execute(
+                    "INSERT INTO execution_totals VALUES (1, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET total = total + excluded.total, "
+                    "successful = successful + excluded.successful, "
+                    "failed = failed + excluded.failed",
+                    (len(records), successful, len(records) - successful)
+                )
+                cursor.executemany(
+                    "INSERT INTO tool_totals VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (tool) DO UPDATE SET uses = uses + excluded.uses, "
+                    "calls = calls + excluded.calls, "
+                    "successes = successes + excluded.successes, "
+                    "total_time = total_time + excluded.total_time, "
+                    "time_count = time_count + excluded.time_count, "
+                    "max_time = MAX(COALESCE(max_time, excluded.max_time), "
+                    "COALESCE(excluded.max_time, max_time))",
+                    [(tool, *totals) for tool, totals in tool_totals.items()]
+                )
+                cursor.executemany(
+                    "INSERT INTO execution_hourly VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (hour) DO UPDATE SET total = total + excluded.total, "
+                    "successful = successful + excluded.successful, "
+                    "duration_sum = duration_sum + excluded.duration_sum, "
+                    "duration_count = duration_count + excluded.duration_count, "
+                    "max_duration = MAX(COALESCE(max_duration, excluded.max_duration), "
+                    "COALESCE(excluded.max_duration, max_duration))",
+                    [(hour, *acc) for hour, acc in hourly.items()]
+                )
+                cursor.executemany(
+                    "INSERT INTO tool_hourly VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (tool, hour) DO UPDATE SET calls = calls + excluded.calls, "
+                    "successes = successes + excluded.successes, "
+                    "time_sum = time_sum + excluded.time_sum, "
+                    "time_count = time_count + excluded.time_count, "
+                    "max_time = MAX(COALESCE(max_time, excluded.max_time), "
+                    "COALESCE(excluded.max_time, max_time))",
+                    [(tool, hour, *acc) for (tool, hour), acc in tool_hourly.items()]
+                )
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+    
+    def _insert_execution(self, cursor: sqlite3.Cursor,
+                          record: Dict[str, Any]) -> Tuple[int, float, List[Tuple], List[Tuple]]:
+        plan = record.get("plan") or {}
+        result = record.get("result") or {}
+        ts = _epoch(record.get("timestamp"))
+        plan_steps = plan.get("steps", [])
+        
+        cursor.execute(
+            "INSERT INTO executions (ts, task, status, success, total_steps, steps_failed, "
+            "duration, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                ts,
+                record.get("task"),
+                result.get("plan_status"),
+                int(bool(record.get("success"))),
+                len(plan_steps),
+                result.get("steps_failed", 0),
+                result.get("duration"),
+                json.dumps(record, separators=(",", ":"), default=str)
+            )
+        )
+        execution_id = cursor.lastrowid
+        
+        steps = [
+            (execution_id, step.get("step_id", position), step.get("tool"), step.get("status"))
+            for position, step in enumerate(plan_steps, 1)
+        ]
+        # Aturan sama dengan LearningModule._update_metrics: hasil dari cache
+        # bukan call, timeout dihitung call gagal, latency hanya dari call berhasil
+        calls = []
+        for step_result in result.get("results", []):
+            call = step_result.get("result")
+            if step_result.get("status") == "timed_out" and step_result.get("tool"):
+                call = {"tool": step_result["tool"], "success": False}
+            if isinstance(call, dict) and call.get("tool") and not call.get("cached"):
+                success = bool(call.get("success"))
+                calls.append((
+                    execution_id, ts, call["tool"], int(success),
+                    call.get("execution_time") if success else None
+                ))
+        return execution_id, ts, steps, calls
+    
+    def flush(self, sync: bool = False):
+        """Setiap batch sudah di-commit; tidak ada buffer"""
+        pass
+    
+    def compact(self):
+        """Checkpoint WAL ke database utama"""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    # -- Snapshot / history ---------------------------------------------
+    
+    def position(self) -> Dict[str, Any]:
+        with self._lock:
+            last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM executions").fetchone()[0]
+        return {"backend": self.BACKEND, "segment": 0, "offset": last_id}
+    
+    def tail(self, position: Dict[str, Any]) -> Optional[Iterator[Dict[str, Any]]]:
+        """Record setelah `position`; None jika posisi berasal dari backend lain"""
+        if position.get("backend") != self.BACKEND:
+            return None
+        if self.position()["offset"] < position["offset"]:
+            return None
+        return self._iter_records(position["offset"])
+    
+    def _iter_records(self, after_id: int = 0, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        # Dibaca per halaman supaya lock tidak ditahan selama iterasi
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, record FROM executions WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, page_size)
+                ).fetchall()
+            for after_id, record in rows:
+                yield json.loads(record)
+            if len(rows) < page_size:
+                return
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._iter_records()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM executions").fetchone()[0]
+    
+    def is_empty(self) -> bool:
+        """Cek keberadaan record tanpa menghitung seluruh tabel"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM executions LIMIT 1").fetchone() is None
+    
+    def read_all(self) -> List[Dict[str, Any]]:
+        return list(self)
+    
+    # -- Queries ----------------------------------------------------------
+    
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def insights(self, top: int = 5) -> Dict[str, Any]:
+        """Sama dengan LearningModule.get_insights(), dari tabel rollup"""
+        totals = self._query("SELECT total, successful, failed FROM execution_totals")
+        totals = totals[0] if totals else {"total": 0, "successful": 0, "failed": 0}
+        tools = self._query(
+            "SELECT tool, uses FROM tool_totals WHERE uses > 0 ORDER BY uses DESC LIMIT ?", (top,)
+        )
+        used = self._query("SELECT COALESCE(SUM(uses), 0) AS used FROM tool_totals")[0]["used"]
+        timed_out = self._query(
+            "SELECT COUNT(*) AS n FROM executions WHERE status = 'timed_out'"
+        )[0]["n"]
+        
+        return {
+            "total_executions": totals["total"],
+            "success_rate": _rate(totals["successful"], totals["total"]),
+            "successful": totals["successful"],
+            "failed": totals["failed"],
+            "timed_out": timed_out,
+            "total_tools_used": used,
+            "most_used_tools": [{"tool": row["tool"], "count": row["uses"]} for row in tools]
+        }
+    
+    def window_stats(self, since: float, until: float = None) -> Dict[str, Any]:
+        """Agregat eksekusi dalam rentang waktu [since, until) (epoch detik)"""
+        edges, hours = _split_window(since, until)
+        acc = [0, 0, 0.0, 0, None]
+        
+        for start, end in edges:
+            row = self._query(
+                "SELECT COUNT(*) AS n, COALESCE(SUM(success), 0) AS ok, "
+                "COALESCE(SUM(duration), 0.0) AS dsum, COUNT(duration) AS dn, "
+                "MAX(duration) AS dmax FROM executions WHERE ts >= ? AND ts < ?",
+                (start, end)
+            )[0]
+            self._merge_row(acc, row)
+        if hours is not None:
+            row = self._query(
+                "SELECT COALESCE(SUM(total), 0) AS n, COALESCE(SUM(successful), 0) AS ok, "
+                "COALESCE(SUM(duration_sum), 0.0) AS dsum, "
+                "COALESCE(SUM(duration_count), 0) AS dn, MAX(max_duration) AS dmax "
+                "FROM execution_hourly WHERE hour >= ? AND hour < ?",
+                (hours[0], hours[1] if hours[1] is not None else 2 ** 62)
+            )[0]
+            self._merge_row(acc, row)
+        
+        total, successful, duration_sum, duration_count, max_duration = acc
+        return {
+            "total": total,
+            "successful": successful,
+            "failed": total - successful,
+            "success_rate": _rate(successful, total),
+            "avg_duration": duration_sum / duration_count if duration_count else None,
+            "max_duration": max_duration
+        }
+    
+    @staticmethod
+    def _merge_row(acc: List, row: Dict[str, Any]):
+        acc[0] += row["n"]
+        acc[1] += row["ok"]
+        acc[2] += row["dsum"]
+        acc[3] += row["dn"]
+        acc[4] = _max(acc[4], row["dmax"])
+    
+    def tool_stats(self, tool: str = None, since: float = None,
+                   until: float = None) -> List[Dict[str, Any]]:
+        """Jumlah call, success rate dan latency per tool (opsional dalam rentang waktu)"""
+        if since is None and until is None:
+            sql = ("SELECT tool, calls, successes, "
+                   "CASE WHEN time_count THEN total_time / time_count END AS avg_time, "
+                   "max_time FROM tool_totals WHERE calls > 0")
+            params: Tuple = ()
+            if tool is not None:
+                sql += " AND tool = ?"
+                params = (tool,)
+            rows = self._query(sql + " ORDER BY calls DESC", params)
+            for row in rows:
+                row["success_rate"] = _rate(row["successes"], row["calls"])
+            return rows
+        
+        edges, hours = _split_window(since or 0.0, until)
+        tool_filter = "" if tool is None else "tool = ? AND "
+        tool_param: Tuple = () if tool is None else (tool,)
+        per_tool: Dict[str, List] = {}
+        
+        rows = []
+        for start, end in edges:
+            rows += self._query(
+                "SELECT tool, COUNT(*) AS n, SUM(success) AS ok, "
+                "COALESCE(SUM(execution_time), 0.0) AS dsum, COUNT(execution_time) AS dn, "
+                "MAX(execution_time) AS dmax "
+                f"FROM tool_calls WHERE {tool_filter}ts >= ? AND ts < ? GROUP BY tool",
+                tool_param + (start, end)
+            )
+        if hours is not None:
+            rows += self._query(
+                "SELECT tool, SUM(calls) AS n, SUM(successes) AS ok, SUM(time_sum) AS dsum, "
+                "SUM(time_count) AS dn, MAX(max_time) AS dmax "
+                f"FROM tool_hourly WHERE {tool_filter}hour >= ? AND hour < ? GROUP BY tool",
+                tool_param + (hours[0], hours[1] if hours[1] is not None else 2 ** 62)
+            )
+        for row in rows:
+            self._merge_row(per_tool.setdefault(row["tool"], [0, 0, 0.0, 0, None]), row)
+        
+        stats = [
+            {
+                "tool": name,
+                "calls": calls,
+                "successes": successes,
+                "avg_time": time_sum / time_count if time_count else None,
+                "max_time": max_time,
+                "success_rate": _rate(successes, calls)
+            }
+            for name, (calls, successes, time_sum, time_count, max_time) in per_tool.items()
+        ]
+        stats.sort(key=lambda row: row["calls"], reverse=True)
+        return stats
+    
+    def slowest_tasks(self, limit: int = 10, since: float = None) -> List[Dict[str, Any]]:
+        """Eksekusi dengan durasi terlama (opsional sejak waktu tertentu)"""
+        if since is None:
+            sql = ("SELECT id, ts, task, status, duration FROM executions "
+                   "WHERE duration IS NOT NULL ORDER BY duration DESC LIMIT ?")
+            params: Tuple = (limit,)
+        else:
+            sql = ("SELECT id, ts, task, status, duration FROM executions "
+                   "WHERE ts >= ? AND duration IS NOT NULL ORDER BY duration DESC LIMIT ?")
+            params = (since, limit)
+        
+        rows = self._query(sql, params)
+        for row in rows:
+            row["timestamp"] = datetime.fromtimestamp(row.pop("ts")).isoformat()
+        return rows
+    
+    def close(self, sync: bool = True):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -6,6 +6,25 @@ File: tools/base.py
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 from datetime import datetime
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from tools.cache import ResultCache
+from config.settings import settings
+from utils.metrics import LatencyTracker, metrics
+
+
+TOOL_CALLS = metrics.counter(
+    "tool_calls_total", "Tool calls by outcome", ["tool", "category", "status"]
+)
+TOOL_DURATION = metrics.histogram(
+    "tool_execution_duration_seconds", "Tool execution time", ["tool", "category", "status"]
+)
 
 
 class ToolMetadata:
@@ -33,6 +52,13 @@ class ToolParameter:
 class BaseTool(ABC):
     """Base class untuk semua tools"""
     
+    # Tool yang merupakan fungsi murni dari kwargs-nya bisa set True
+    # supaya hasilnya di-cache (opt-in)
+    cacheable: bool = False
+    # Batas waktu satu call (detik) saat dijalankan Executor;
+    # None = pakai settings.TOOL_DEFAULT_TIMEOUT (0 = tanpa batas)
+    default_timeout: Optional[float] = None
+    
     def __init__(self, metadata: ToolMetadata):
         self.metadata = metadata
         self.parameters: List[ToolParameter] = []
@@ -40,11 +66,27 @@ class BaseTool(ABC):
         self.success_count = 0
         self.error_count = 0
         self.last_used = None
-        self.execution_times: List[float] = []
+        # Sketch quantile berukuran tetap, bukan list semua durasi
+        self.latency = LatencyTracker(window=settings.TOOL_LATENCY_WINDOW)
+        # Counters may be updated from several executor threads
+        self._stats_lock = threading.Lock()
+        
+        self.cache: Optional[ResultCache] = None
+        if self.cacheable:
+            self.cache = ResultCache(
+                max_size=settings.TOOL_CACHE_SIZE,
+                ttl=settings.TOOL_CACHE_TTL,
+                persist_dir=(settings.CACHE_DIR / "tools" / metadata.name
+                             if settings.TOOL_CACHE_PERSISTENT else None),
+                persist_max_bytes=settings.TOOL_CACHE_PERSIST_MAX_MB * 1024 * 1024
+            )
     
     @abstractmethod
     def execute(self, **kwargs) -> Any:
-        """Method utama yang harus diimplementasi"""
+        """Method utama yang harus diimplementasi
+        
+        Boleh didefinisikan sebagai `async def execute` untuk tool I/O-bound.
+        """
         pass
     
     @abstractmethod
@@ -79,56 +121,231 @@ class BaseTool(ABC):
             }
         }
     
+    @property
+    def is_async(self) -> bool:
+        """True jika tool mengimplementasikan `async def execute`"""
+        return inspect.iscoroutinefunction(self.execute)
+    
     def run(self, **kwargs) -> Dict[str, Any]:
         """Wrapper untuk execute dengan error handling"""
-        import time
+        invalid = self._begin_run(**kwargs)
+        if invalid:
+            return invalid
+        
+        key, cached = self._cache_lookup(kwargs)
+        if cached is not None:
+            return cached
         
-        self.usage_count += 1
-        self.last_used = datetime.now().isoformat()
+        try:
+            start_time = time.time()
+            if self.is_async:
+                # Async-only tool dipanggil dari kode sync
+                result = asyncio.run(self.execute(**kwargs))
+            else:
+                result = self.execute(**kwargs)
+            return self._record_success(result, time.time() - start_time, key)
+        except Exception as e:
+            return self._record_error(e, time.time() - start_time)
+    
+    async def arun(self, **kwargs) -> Dict[str, Any]:
+        """Versi async dari run()
+        
+        Tool sync dijalankan di thread pool default event loop supaya
+        tidak memblokir loop.
+        """
+        invalid = self._begin_run(**kwargs)
+        if invalid:
+            return invalid
+        
+        key, cached = self._cache_lookup(kwargs)
+        if cached is not None:
+            return cached
+        
+        try:
+            start_time = time.time()
+            if self.is_async:
+                result = await self.execute(**kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    None, functools.partial(self.execute, **kwargs)
+                )
+            return self._record_success(result, time.time() - start_time, key)
+        except Exception as e:
+            return self._record_error(e, time.time() - start_time)
+    
+    def cache_key(self, **kwargs) -> Optional[str]:
+        """Key cache dari kwargs yang dikanonikalisasi; None = jangan di-cache"""
+        try:
+            canonical = json.dumps(kwargs, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+        raw = f"{self.metadata.name}:{self.metadata.version}:{canonical}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _cache_lookup(self, kwargs: Dict[str, Any]):
+        """Return (key, response); response tidak None jika cache hit"""
+        if self.cache is None:
+            return None, None
+        
+        key = self.cache_key(**kwargs)
+        if key is None:
+            return None, None
+        
+        start_time = time.time()
+        found, value = self.cache.get(key)
+        if not found:
+            return key, None
+        
+        # Hit dihitung di cache.hits, bukan success_count: success_count
+        # (dan cost model) hanya mencerminkan eksekusi sebenarnya
+        execution_time = time.time() - start_time
+        self._observe("cached", execution_time)
+        return None, {
+            "success": True,
+            "result": copy.deepcopy(value),
+            "tool": self.metadata.name,
+            "execution_time": execution_time,
+            "cached": True
+        }
+    
+    def _observe(self, status: str, execution_time: float = None):
+        """Kirim hasil pemanggilan ke metrics registry"""
+        labels = {"tool": self.metadata.name, "category": self.metadata.category,
+                  "status": status}
+        TOOL_CALLS.inc(**labels)
+        if execution_time is not None:
+            TOOL_DURATION.observe(execution_time, **labels)
+    
+    def _begin_run(self, **kwargs) -> Optional[Dict[str, Any]]:
+        """Update counter dan validasi input; return error dict jika invalid"""
+        with self._stats_lock:
+            self.usage_count += 1
+            self.last_used = datetime.now().isoformat()
         
         if not self.validate_input(**kwargs):
-            self.error_count += 1
+            with self._stats_lock:
+                self.error_count += 1
+            self._observe("invalid")
             return {
                 "success": False,
                 "error": "Invalid input parameters",
                 "tool": self.metadata.name
             }
-        
-        try:
-            start_time = time.time()
-            result = self.execute(**kwargs)
-            execution_time = time.time() - start_time
-            
-            self.execution_times.append(execution_time)
+        return None
+    
+    def _record_success(self, result: Any, execution_time: float,
+                        cache_key: str = None) -> Dict[str, Any]:
+        with self._stats_lock:
+            self.latency.add(execution_time)
             self.success_count += 1
-            
-            return {
-                "success": True,
-                "result": result,
-                "tool": self.metadata.name,
-                "execution_time": execution_time
-            }
-        except Exception as e:
+        self._observe("success", execution_time)
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, copy.deepcopy(result))
+        
+        return {
+            "success": True,
+            "result": result,
+            "tool": self.metadata.name,
+            "execution_time": execution_time
+        }
+    
+    def _record_error(self, error: Exception, execution_time: float = None) -> Dict[str, Any]:
+        with self._stats_lock:
             self.error_count += 1
+        self._observe("error", execution_time)
+        return {
+            "success": False,
+            "error": str(error),
+            "tool": self.metadata.name
+        }
+    
+    def export_stats(self, reset: bool = False) -> Dict[str, Any]:
+        """Export counter mentah (untuk digabung antar proses)"""
+        with self._stats_lock:
+            stats = {
+                "usage_count": self.usage_count,
+                "success_count": self.success_count,
+                "error_count": self.error_count,
+                "latency": self.latency.to_dict(),
+                "last_used": self.last_used
+            }
+            if reset:
+                self.usage_count = 0
+                self.success_count = 0
+                self.error_count = 0
+                self.latency = LatencyTracker(window=settings.TOOL_LATENCY_WINDOW)
+        
+        if self.cache is not None:
+            stats["cache_hits"] = self.cache.hits
+            stats["cache_misses"] = self.cache.misses
+            if reset:
+                self.cache.hits = 0
+                self.cache.misses = 0
+        return stats
+    
+    def merge_stats(self, stats: Dict[str, Any]):
+        """Gabungkan counter dari export_stats() milik proses lain"""
+        with self._stats_lock:
+            self.usage_count += stats["usage_count"]
+            self.success_count += stats["success_count"]
+            self.error_count += stats["error_count"]
+            self.latency.merge(LatencyTracker.from_dict(stats["latency"]))
+            if stats["last_used"] and (not self.last_used or stats["last_used"] > self.last_used):
+                self.last_used = stats["last_used"]
+        
+        if self.cache is not None:
+            self.cache.hits += stats.get("cache_hits", 0)
+            self.cache.misses += stats.get("cache_misses", 0)
+    
+    def __getstate__(self):
+        # Lock tidak bisa di-pickle (dibutuhkan saat dikirim ke worker process)
+        state = self.__dict__.copy()
+        del state["_stats_lock"]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+    
+    def get_cost_stats(self) -> Dict[str, Any]:
+        """Statistik numerik mentah untuk cost model (lihat core/cost_model.py)"""
+        with self._stats_lock:
+            sketch = self.latency.sketch
             return {
-                "success": False,
-                "error": str(e),
-                "tool": self.metadata.name
+                "calls": self.success_count + self.error_count,
+                "successes": self.success_count,
+                "latency_samples": sketch.count,
+                "mean_latency": sketch.mean,
+                "p95_latency": sketch.quantile(0.95)
             }
     
     def get_stats(self) -> Dict:
         """Dapatkan statistik penggunaan tool"""
-        avg_time = (sum(self.execution_times) / len(self.execution_times) 
-                   if self.execution_times else 0)
+        with self._stats_lock:
+            latency = self.latency.summary()
+        hits = self.cache.hits if self.cache is not None else 0
         
-        return {
+        stats = {
             "name": self.metadata.name,
             "category": self.metadata.category,
             "usage_count": self.usage_count,
             "success_count": self.success_count,
             "error_count": self.error_count,
-            "success_rate": f"{(self.success_count / self.usage_count * 100):.1f}%" 
+            "success_rate": f"{((self.success_count + hits) / self.usage_count * 100):.1f}%" 
                            if self.usage_count > 0 else "N/A",
-            "average_execution_time": f"{avg_time:.3f}s",
+            "average_execution_time": f"{latency['mean']:.3f}s",
+            "p50_execution_time": f"{latency['p50']:.3f}s",
+            "p95_execution_time": f"{latency['p95']:.3f}s",
+            "p99_execution_time": f"{latency['p99']:.3f}s",
+            "max_execution_time": f"{latency['max']:.3f}s",
+            "recent_p95_execution_time": f"{latency['recent_p95']:.3f}s",
             "last_used": self.last_used
         }
+        
+        if self.cache is not None:
+            stats["cache_hits"] = self.cache.hits
+            stats["cache_misses"] = self.cache.misses
+        
+        return stats
@@ -0,0 +1,189 @@
+"""
+Tool Result Cache
+File: tools/cache.py
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import os
+import pickle
+import threading
+import time
+
+
+class ResultCache:
+    """Cache LRU in-memory dengan TTL dan optional persistent tier di disk
+    
+    Persistent tier dibatasi `persist_max_bytes`: jika terlampaui, file
+    paling lama tidak dipakai (mtime, disentuh saat disk hit) dihapus
+    sampai ukuran turun ke PRUNE_RATIO dari batas.
+    """
+    
+    PRUNE_RATIO = 0.8
+    
+    def __init__(self, max_size: int = 1024, ttl: float = None,
+                 persist_dir: str = None, persist_max_bytes: int = 64 * 1024 * 1024):
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        self.persist_max_bytes = persist_max_bytes
+        self._disk_bytes = 0
+        if self.persist_dir:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        
+        # key -> (expires_at, value); expires_at adalah wall-clock supaya
+        # tetap berlaku untuk entry yang dibaca ulang dari disk
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value)"""
+        now = time.time()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+        
+        entry = self._load(key)
+        if entry is not None and (entry[0] is None or entry[0] > now):
+            with self._lock:
+                self._insert(key, entry)
+                self.hits += 1
+                self.disk_hits += 1
+            return True, entry[1]
+        
+        with self._lock:
+            self.misses += 1
+        return False, None
+    
+    def set(self, key: str, value: Any):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        entry = (expires_at, value)
+        
+        with self._lock:
+            self._insert(key, entry)
+        self._store(key, entry)
+    
+    def _insert(self, key: str, entry: Tuple[Optional[float], Any]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def _load(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        if not self.persist_dir:
+            return None
+        path = self.persist_dir / f"{key}.pkl"
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+            os.utime(path)
+            return entry
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+    
+    def _store(self, key: str, entry: Tuple[Optional[float], Any]):
+        if not self.persist_dir:
+            return
+        path = self.persist_dir / f"{key}.pkl"
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            # Menimpa key yang sama: hanya selisih ukuran yang ditambahkan
+            try:
+                size -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            # Hasil yang tidak bisa di-pickle cukup disimpan in-memory
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        
+        with self._lock:
+            self._disk_bytes += size
+            over = self.persist_max_bytes and self._disk_bytes > self.persist_max_bytes
+        if over:
+            self._prune_disk()
+    
+    def _disk_entries(self):
+        """(path, size, mtime) untuk setiap file di persistent tier"""
+        entries = []
+        for path in self.persist_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+    
+    def _prune_disk(self):
+        # Scan ulang: direktori bisa dipakai bersama proses lain
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.persist_max_bytes * self.PRUNE_RATIO
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.disk_evictions += 1
+        with self._lock:
+            self._disk_bytes = total
+    
+    def clear(self):
+        """Kosongkan cache in-memory dan persistent tier"""
+        with self._lock:
+            self._entries.clear()
+        if self.persist_dir:
+            for path in self.persist_dir.glob("*.pkl"):
+                path.unlink()
+            self._disk_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "hit_rate": f"{(self.hits / lookups * 100):.1f}%" if lookups else "N/A"
+        }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
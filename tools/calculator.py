@@ -4,16 +4,72 @@ File: tools/calculator.py
 """
 
 from tools.base import BaseTool, ToolMetadata, ToolParameter
+from typing import Any, Dict, Optional
 import math
 
 
+DIVISION_BY_ZERO = "Error: Division by zero"
+
+UNARY_OPERATIONS = ("sqrt", "sin", "cos", "tan")
+
+# Dibuat sekali di level modul, bukan di setiap pemanggilan execute()
+SCALAR_OPERATIONS = {
+    "add": lambda x, y: x + y,
+    "subtract": lambda x, y: x - y,
+    "multiply": lambda x, y: x * y,
+    "divide": lambda x, y: x / y if y != 0 else DIVISION_BY_ZERO,
+    "power": lambda x, y: x ** y,
+    "sqrt": lambda x, y: math.sqrt(x),
+    "sin": lambda x, y: math.sin(x),
+    "cos": lambda x, y: math.cos(x),
+    "tan": lambda x, y: math.tan(x)
+}
+
+# Ufunc mode batch; diisi saat batch pertama supaya numpy tetap lazy import.
+# "divide" tidak ada di sini karena ditangani per elemen (DIVISION_BY_ZERO)
+BATCH_OPERATIONS: Dict[str, Any] = {}
+
+
+def _batch_operations() -> Dict[str, Any]:
+    if not BATCH_OPERATIONS:
+        import numpy as np
+        BATCH_OPERATIONS.update({
+            "add": np.add,
+            "subtract": np.subtract,
+            "multiply": np.multiply,
+            "power": np.power,
+            "sqrt": np.sqrt,
+            "sin": np.sin,
+            "cos": np.cos,
+            "tan": np.tan
+        })
+    return BATCH_OPERATIONS
+
+
+def _is_batch(value: Any) -> bool:
+    """True untuk list/tuple atau array berdimensi >= 1 (mode batch)
+    
+    Scalar NumPy dan array 0-d juga punya __array__, tapi tetap mode scalar.
+    """
+    if isinstance(value, (list, tuple)):
+        return True
+    if not hasattr(value, "__array__"):
+        return False
+    import numpy as np
+    return np.ndim(value) > 0
+
+
 class CalculatorTool(BaseTool):
     """Tool untuk operasi matematika"""
     
+    # Hasil hanya bergantung pada kwargs
+    cacheable = True
+    
     def __init__(self):
         metadata = ToolMetadata(
             name="calculator",
-            description="Perform mathematical operations: add, subtract, multiply, divide, power, sqrt, sin, cos, tan",
+            description="Perform mathematical operations: add, subtract, multiply, divide, power, sqrt, sin, cos, tan. "
+                        "Operands may be arrays (or a list of [a, b] pairs) for vectorized batch evaluation",
             category="computation"
         )
         super().__init__(metadata)
@@ -25,10 +81,14 @@ class CalculatorTool(BaseTool):
             required=True
         ))
         self.add_parameter(ToolParameter(
-            "a", "number", "First number", required=True
+            "a", "number", "First number, or an array of numbers for batch mode", required=True
         ))
         self.add_parameter(ToolParameter(
-            "b", "number", "Second number (not required for sqrt, sin, cos, tan)", 
+            "b", "number", "Second number or array (not required for sqrt, sin, cos, tan)", 
+            required=False
+        ))
+        self.add_parameter(ToolParameter(
+            "pairs", "array", "Batch mode: list of [a, b] operand pairs (replaces a and b)",
             required=False
         ))
     
@@ -37,33 +97,69 @@ class CalculatorTool(BaseTool):
         a = kwargs.get("a")
         b = kwargs.get("b")
         
-        valid_ops = ["add", "subtract", "multiply", "divide", "power", 
-                     "sqrt", "sin", "cos", "tan"]
-        
-        if operation not in valid_ops:
+        if operation not in SCALAR_OPERATIONS:
             return False
+        if kwargs.get("pairs") is not None:
+            return True
         if a is None:
             return False
-        if operation not in ["sqrt", "sin", "cos", "tan"] and b is None:
+        if operation not in UNARY_OPERATIONS and b is None:
             return False
         
         return True
     
-    def execute(self, **kwargs) -> float:
+    def cache_key(self, **kwargs) -> Optional[str]:
+        # Batch besar tidak di-cache: hashing operand lebih mahal dari ufunc-nya
+        if self._batch_mode(kwargs):
+            return None
+        return super().cache_key(**kwargs)
+    
+    def _batch_mode(self, kwargs) -> bool:
+        return (kwargs.get("pairs") is not None
+                or _is_batch(kwargs.get("a"))
+                or _is_batch(kwargs.get("b")))
+    
+    def execute(self, **kwargs) -> Any:
+        if self._batch_mode(kwargs):
+            return self._execute_batch(**kwargs)
+        
         operation = kwargs["operation"]
         a = float(kwargs["a"])
-        b = float(kwargs.get("b", 0))
+        b = float(kwargs.get("b") or 0)
+        
+        return SCALAR_OPERATIONS[operation](a, b)
+    
+    def _execute_batch(self, **kwargs):
+        """Evaluasi seluruh batch dengan NumPy ufunc dalam satu panggilan
+        
+        Division by zero ditangani per elemen: elemen tersebut berisi
+        DIVISION_BY_ZERO seperti pada mode scalar (array menjadi dtype object).
+        Error domain lain tidak menggagalkan seluruh batch: elemen tersebut
+        berisi nan/inf (mis. sqrt(-1), 0 ** -1), sedangkan mode scalar
+        mengembalikan error dari run().
+        """
+        import numpy as np
+        
+        operation = kwargs["operation"]
         
-        operations = {
-            "add": lambda x, y: x + y,
-            "subtract": lambda x, y: x - y,
-            "multiply": lambda x, y: x * y,
-            "divide": lambda x, y: x / y if y != 0 else "Error: Division by zero",
-            "power": lambda x, y: x ** y,
-            "sqrt": lambda x, y: math.sqrt(x),
-            "sin": lambda x, y: math.sin(x),
-            "cos": lambda x, y: math.cos(x),
-            "tan": lambda x, y: math.tan(x)
-        }
+        if kwargs.get("pairs") is not None:
+            pairs = np.asarray(kwargs["pairs"], dtype=float).reshape(-1, 2)
+            a, b = pairs[:, 0], pairs[:, 1]
+        else:
+            a = np.asarray(kwargs["a"], dtype=float)
+            b = np.asarray(kwargs["b"] if kwargs.get("b") is not None else 0.0, dtype=float)
         
-        return operations[operation](a, b)
+        with np.errstate(all="ignore"):
+            if operation == "divide":
+                a, b = np.broadcast_arrays(a, b)
+                zero = b == 0
+                result = np.divide(a, np.where(zero, 1.0, b))
+                if zero.any():
+                    result = result.astype(object)
+                    result[zero] = DIVISION_BY_ZERO
+                return result
+            
+            ufunc = _batch_operations()[operation]
+            if operation in UNARY_OPERATIONS:
+                return ufunc(a)
+            return ufunc(a, b)
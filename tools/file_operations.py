@@ -4,9 +4,16 @@ File: tools/file_operations.py
 """
 
 from tools.base import BaseTool, ToolMetadata, ToolParameter
+import mmap
 import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+
+OPERATIONS = ["read", "write", "list", "delete", "exists",
+              "read_bytes", "read_lines", "mmap", "iter_chunks"]
+
+DEFAULT_CHUNK_SIZE = 1 << 20
 
 
 class FileOperationTool(BaseTool):
@@ -15,7 +22,8 @@ class FileOperationTool(BaseTool):
     def __init__(self, allowed_dirs: list = None):
         metadata = ToolMetadata(
             name="file_operation",
-            description="Read, write, list, or delete files. Operations: read, write, list, delete, exists",
+            description="Read, write, list, or delete files. Operations: read, write, list, delete, exists, "
+                        "read_bytes, read_lines (ranged reads), mmap, iter_chunks (zero-copy reads)",
             category="file_system"
         )
         super().__init__(metadata)
@@ -25,7 +33,7 @@ class FileOperationTool(BaseTool):
         
         self.add_parameter(ToolParameter(
             "operation", "string", 
-            "Operation: read, write, list, delete, exists",
+            "Operation: " + ", ".join(OPERATIONS),
             required=True
         ))
         self.add_parameter(ToolParameter(
@@ -35,17 +43,41 @@ class FileOperationTool(BaseTool):
             "content", "string", "Content to write (for write operation)", 
             required=False
         ))
+        self.add_parameter(ToolParameter(
+            "offset", "integer",
+            "Byte offset for read_bytes/mmap (negative counts from the end of the file)",
+            required=False, default=0
+        ))
+        self.add_parameter(ToolParameter(
+            "length", "integer", "Number of bytes for read_bytes/mmap (default: to end of file)",
+            required=False
+        ))
+        self.add_parameter(ToolParameter(
+            "start_line", "integer",
+            "First line for read_lines, 0-based (negative reads the last N lines)",
+            required=False, default=0
+        ))
+        self.add_parameter(ToolParameter(
+            "line_count", "integer", "Number of lines for read_lines (default: to end of file)",
+            required=False
+        ))
+        self.add_parameter(ToolParameter(
+            "chunk_size", "integer", "Chunk size in bytes for iter_chunks",
+            required=False, default=DEFAULT_CHUNK_SIZE
+        ))
     
     def validate_input(self, **kwargs) -> bool:
         operation = kwargs.get("operation")
         path = kwargs.get("path")
         
-        if operation not in ["read", "write", "list", "delete", "exists"]:
+        if operation not in OPERATIONS:
             return False
         if not path:
             return False
         if operation == "write" and not kwargs.get("content"):
             return False
+        if operation == "iter_chunks" and kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE) <= 0:
+            return False
         
         # Security check
         abs_path = os.path.abspath(path)
@@ -84,3 +116,102 @@ class FileOperationTool(BaseTool):
         
         elif operation == "exists":
             return {"exists": os.path.exists(path), "path": path}
+        
+        elif operation == "read_bytes":
+            return self._read_bytes(path, kwargs.get("offset", 0), kwargs.get("length"))
+        
+        elif operation == "read_lines":
+            return self._read_lines(path, kwargs.get("start_line", 0), kwargs.get("line_count"))
+        
+        elif operation == "mmap":
+            return self._mmap_view(path, kwargs.get("offset", 0), kwargs.get("length"))
+        
+        elif operation == "iter_chunks":
+            return self._iter_chunks(path, kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE))
+    
+    def _byte_range(self, size: int, offset: int, length: int = None):
+        """Normalisasi offset (boleh negatif) dan length ke (start, end)"""
+        start = max(size + offset, 0) if offset < 0 else min(offset, size)
+        end = size if length is None else min(start + max(length, 0), size)
+        return start, end
+    
+    def _read_bytes(self, path: str, offset: int = 0, length: int = None) -> bytes:
+        """Baca range byte dengan seek - biaya O(length), bukan O(ukuran file)"""
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            start, end = self._byte_range(size, offset, length)
+            f.seek(start)
+            return f.read(end - start)
+    
+    def _open_mmap(self, path: str):
+        """Map file read-only; None untuk file kosong (mmap tidak bisa panjang 0)"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def _mmap_view(self, path: str, offset: int = 0, length: int = None) -> memoryview:
+        """Zero-copy memoryview atas range file yang di-mmap
+        
+        Mapping tetap hidup selama memoryview (atau slice-nya) masih dipakai.
+        """
+        mapped = self._open_mmap(path)
+        if mapped is None:
+            return memoryview(b"")
+        start, end = self._byte_range(len(mapped), offset, length)
+        return memoryview(mapped)[start:end]
+    
+    def _iter_chunks(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[memoryview]:
+        """Iterator memoryview chunk atas file yang di-mmap (tanpa copy)
+        
+        File dibuka dan di-map saat operasi dijalankan (bukan saat iterasi
+        pertama), sehingga error seperti file tidak ada masuk ke hasil
+        error biasa dari run().
+        """
+        view = self._mmap_view(path)
+        return (view[start:start + chunk_size] for start in range(0, len(view), chunk_size))
+    
+    def _read_lines(self, path: str, start_line: int = 0, line_count: int = None) -> str:
+        """Baca range baris; start_line negatif membaca N baris terakhir
+        
+        Tail hanya menyentuh halaman di akhir file, sehingga biayanya tidak
+        bergantung pada ukuran file.
+        """
+        mapped = self._open_mmap(path)
+        if mapped is None:
+            return ""
+        
+        try:
+            size = len(mapped)
+            if start_line < 0:
+                # Abaikan newline penutup file saat menghitung dari belakang
+                position = size - 1 if mapped[size - 1:size] == b"\n" else size
+                start = 0
+                for _ in range(-start_line):
+                    newline = mapped.rfind(b"\n", 0, position)
+                    if newline == -1:
+                        break
+                    position = newline
+                else:
+                    start = position + 1
+            else:
+                start = 0
+                for _ in range(start_line):
+                    newline = mapped.find(b"\n", start)
+                    if newline == -1:
+                        return ""
+                    start = newline + 1
+            
+            end = size
+            if line_count is not None:
+                end = start
+                for _ in range(max(line_count, 0)):
+                    newline = mapped.find(b"\n", end)
+                    if newline == -1:
+                        end = size
+                        break
+                    end = newline + 1
+            
+            return mapped[start:end].decode('utf-8', errors='replace')
+        finally:
+            mapped.close()
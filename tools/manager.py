@@ -3,32 +3,86 @@ Tool Manager - Orchestrator for all tools
 File: tools/manager.py
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
+import threading
 from tools.base import BaseTool
+from tools.registry import ToolSpec, default_specs
+from utils.log import get_logger
+
+
+logger = get_logger(__name__)
 
 
 class ToolManager:
     """Manager untuk mengelola lifecycle semua tools"""
     
     def __init__(self):
+        # Tool yang sudah dibuat
         self.tools: Dict[str, BaseTool] = {}
+        # Tool yang terdaftar tapi belum di-import (lihat tools/registry.py)
+        self.specs: Dict[str, ToolSpec] = {}
         self.categories: Dict[str, List[str]] = {}
+        # Naik setiap kali registry berubah (dipakai sebagai bagian cache key)
+        self.version = 0
+        self._load_lock = threading.Lock()
+    
+    def _add_to_category(self, name: str, category: str):
+        names = self.categories.setdefault(category, [])
+        if name not in names:
+            names.append(name)
     
     def register(self, tool: BaseTool) -> None:
         """Register tool ke system"""
         self.tools[tool.metadata.name] = tool
+        self.version += 1
         
         # Organize by category
         category = tool.metadata.category
-        if category not in self.categories:
-            self.categories[category] = []
-        self.categories[category].append(tool.metadata.name)
+        self._add_to_category(tool.metadata.name, category)
+        
+        logger.info("✓ Tool registered: %s (%s)", tool.metadata.name, category)
+    
+    def register_lazy(self, spec: ToolSpec) -> None:
+        """Register factory tool; modul baru di-import saat get()/execute() pertama"""
+        if spec.name in self.tools:
+            return
+        self.specs[spec.name] = spec
+        self.version += 1
+        self._add_to_category(spec.name, spec.category)
         
-        print(f"✓ Tool registered: {tool.metadata.name} ({category})")
+        logger.debug("✓ Tool registered (lazy): %s (%s)", spec.name, spec.category)
+    
+    def register_specs(self, specs: Iterable[ToolSpec] = None) -> List[str]:
+        """Register semua spec (default: manifest bawaan + entry point)"""
+        names = []
+        for spec in default_specs() if specs is None else specs:
+            self.register_lazy(spec)
+            names.append(spec.name)
+        
+        logger.info("✓ %d tools available (loaded on first use)", len(names))
+        return names
     
     def get(self, name: str) -> Optional[BaseTool]:
-        """Ambil tool berdasarkan nama"""
-        return self.tools.get(name)
+        """Ambil tool berdasarkan nama, membuat tool lazy bila perlu"""
+        tool = self.tools.get(name)
+        if tool is not None or name not in self.specs:
+            return tool
+        
+        with self._load_lock:
+            tool = self.tools.get(name)
+            if tool is None:
+                try:
+                    tool = self.specs[name].load()
+                except Exception as e:
+                    logger.error("❌ Cannot load tool %s: %s", name, e)
+                    return None
+                self.tools[name] = tool
+                logger.debug("✓ Tool loaded: %s", name)
+        return tool
+    
+    def pending_specs(self) -> List[ToolSpec]:
+        """Spec lazy yang belum dibuat"""
+        return [spec for name, spec in self.specs.items() if name not in self.tools]
     
     def execute(self, name: str, **kwargs) -> Dict[str, Any]:
         """Execute tool dengan error handling"""
@@ -41,15 +95,30 @@ class ToolManager:
         
         return tool.run(**kwargs)
     
+    async def aexecute(self, name: str, **kwargs) -> Dict[str, Any]:
+        """Versi async dari execute()"""
+        tool = self.get(name)
+        if not tool:
+            return {
+                "success": False,
+                "error": f"Tool '{name}' not found"
+            }
+        
+        return await tool.arun(**kwargs)
+    
     def list_tools(self, category: str = None) -> List[str]:
         """List tools, optionally filtered by category"""
         if category:
             return self.categories.get(category, [])
-        return list(self.tools.keys())
+        return list(self.tools.keys()) + [
+            name for name in self.specs if name not in self.tools
+        ]
     
     def get_schemas(self) -> List[Dict]:
-        """Get all tool schemas for LLM"""
-        return [tool.to_schema() for tool in self.tools.values()]
+        """Get all tool schemas for LLM (tool lazy dari metadata manifest)"""
+        schemas = [tool.to_schema() for tool in self.tools.values()]
+        schemas.extend(spec.schema for spec in self.pending_specs())
+        return schemas
     
     def get_statistics(self) -> Dict[str, Dict]:
         """Get usage statistics for all tools"""
@@ -0,0 +1,113 @@
+"""
+Declarative Tool Registry
+File: tools/registry.py
+"""
+
+from importlib import import_module
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+import json
+from tools.base import BaseTool
+from utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+DEFAULT_MANIFEST = Path(__file__).with_name("manifest.json")
+ENTRY_POINT_GROUP = "agentic.tools"
+
+
+class ToolSpec(NamedTuple):
+    """Factory ringan untuk tool: modul di-import saat tool pertama kali dipakai"""
+    name: str
+    module: str
+    class_name: str
+    category: str
+    schema: Dict[str, Any]
+    kwargs: Dict[str, Any] = {}
+    
+    def load(self) -> BaseTool:
+        """Import modul dan buat instance tool"""
+        cls = getattr(import_module(self.module), self.class_name)
+        tool = cls(**self.kwargs)
+        if tool.metadata.name != self.name:
+            raise ValueError(
+                f"Tool spec '{self.name}' built a tool named '{tool.metadata.name}'"
+            )
+        return tool
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ToolSpec":
+        return cls(
+            name=data["name"],
+            module=data["module"],
+            class_name=data["class"],
+            category=data["category"],
+            schema=data["schema"],
+            kwargs=data.get("kwargs", {})
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "module": self.module,
+            "class": self.class_name,
+            "category": self.category,
+            "schema": self.schema
+        }
+        if self.kwargs:
+            data["kwargs"] = self.kwargs
+        return data
+    
+    @classmethod
+    def from_tool(cls, tool: BaseTool, **kwargs) -> "ToolSpec":
+        """Spec dari instance tool (untuk membuat/memperbarui manifest)"""
+        return cls(
+            name=tool.metadata.name,
+            module=type(tool).__module__,
+            class_name=type(tool).__name__,
+            category=tool.metadata.category,
+            schema=tool.to_schema(),
+            kwargs=kwargs
+        )
+
+
+def load_manifest(path: str = None) -> List[ToolSpec]:
+    """Baca daftar ToolSpec dari manifest JSON (default: tools/manifest.json)"""
+    path = Path(path) if path else DEFAULT_MANIFEST
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [ToolSpec.from_dict(entry) for entry in data["tools"]]
+
+
+def write_manifest(specs: Iterable[ToolSpec], path: str = None) -> Path:
+    path = Path(path) if path else DEFAULT_MANIFEST
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"tools": [spec.to_dict() for spec in specs]}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return path
+
+
+def load_entry_points(group: str = ENTRY_POINT_GROUP) -> List[ToolSpec]:
+    """ToolSpec dari package lain yang mendaftar di entry point group 'agentic.tools'
+    
+    Entry point harus menunjuk ke ToolSpec, dict manifest, atau callable yang
+    mengembalikan salah satunya (atau list-nya).
+    """
+    specs = []
+    for entry_point in entry_points(group=group):
+        try:
+            value = entry_point.load()
+            if callable(value) and not isinstance(value, ToolSpec):
+                value = value()
+            for item in value if isinstance(value, list) else [value]:
+                specs.append(item if isinstance(item, ToolSpec) else ToolSpec.from_dict(item))
+        except Exception as e:
+            logger.warning("⚠️  Cannot load tool entry point %s: %s", entry_point.name, e)
+    return specs
+
+
+def default_specs(manifest: Optional[str] = None) -> List[ToolSpec]:
+    """Tool bawaan dari manifest ditambah tool dari entry point"""
+    return load_manifest(manifest) + load_entry_points()
@@ -4,52 +4,303 @@ File: tools/text_analysis.py
 """
 
 from tools.base import BaseTool, ToolMetadata, ToolParameter
-from typing import Dict
+from typing import Dict, Iterable, Iterator, Optional, Union
+import codecs
+import heapq
+import os
+
+
+class UniqueCounter:
+    """Hitung kata unik dengan memori terbatas
+    
+    Exact (set) sampai `limit` kata unik, lalu beralih ke estimasi
+    K-Minimum-Values dengan `k` hash terkecil.
+    """
+    
+    def __init__(self, limit: Optional[int] = None, k: int = 4096):
+        self.limit = limit
+        self.k = k
+        self.exact = set()
+        self.estimated = False
+        self._heap = []  # max-heap (nilai negatif) dari k hash terkecil
+        self._members = set()
+    
+    def update(self, words: Iterable[str]):
+        if not self.estimated:
+            self.exact.update(words)
+            if self.limit is not None and len(self.exact) > self.limit:
+                self.estimated = True
+                words, self.exact = self.exact, set()
+            else:
+                return
+        
+        for word in words:
+            value = (hash(word) & 0xFFFFFFFFFFFFFFFF) / 2.0 ** 64
+            if value in self._members:
+                continue
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, -value)
+                self._members.add(value)
+            elif value < -self._heap[0]:
+                removed = -heapq.heapreplace(self._heap, -value)
+                self._members.discard(removed)
+                self._members.add(value)
+    
+    def count(self) -> int:
+        if not self.estimated:
+            return len(self.exact)
+        if len(self._heap) < self.k:
+            return len(self._heap)
+        return int((self.k - 1) / -self._heap[0])
+
+
+class TextStatistics:
+    """Akumulator statistik teks single-pass untuk input berupa chunk
+    
+    Kata dan pemisah paragraf yang terpotong di batas chunk disimpan
+    sebagai carry sehingga hasilnya identik dengan analisis satu string.
+    Carry kata disimpan sebagai list potongan (linear, bukan concat
+    berulang) dan dibatasi MAX_WORD_LENGTH karakter; token yang lebih
+    panjang tetap dihitung penuh, hanya longest_word/unique yang memakai
+    prefix-nya.
+    """
+    
+    MAX_WORD_LENGTH = 4096
+    
+    def __init__(self, detailed: bool = False, unique_limit: Optional[int] = None):
+        self.detailed = detailed
+        
+        self.characters = 0
+        self.spaces = 0
+        self.words = 0
+        self.sentences = 0
+        self.newlines = 0
+        self.paragraphs = 0
+        
+        self.word_length_total = 0
+        self.longest_word = ""
+        self._longest_length = 0
+        self.unique = UniqueCounter(unique_limit) if detailed else None
+        
+        self._word_parts = []
+        self._word_length = 0
+        self._word_stored = 0
+        self._paragraph_carry = ""
+        self._paragraph_open = False
+        self._decoder = None
+    
+    def feed(self, chunk: Union[str, bytes, bytearray, memoryview]):
+        if not isinstance(chunk, str):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            chunk = self._decoder.decode(chunk)
+        if not chunk:
+            return
+        
+        self.characters += len(chunk)
+        self.spaces += chunk.count(" ")
+        self.sentences += chunk.count(".") + chunk.count("!") + chunk.count("?")
+        self.newlines += chunk.count("\n")
+        
+        self._feed_words(chunk)
+        self._feed_paragraphs(chunk)
+    
+    def _feed_words(self, chunk: str):
+        words = chunk.split()
+        carried = self._word_length > 0
+        
+        if carried and chunk[0].isspace():
+            self._flush_word()
+        elif carried:
+            # Kata pertama adalah lanjutan carry; selesai jika ada spasi setelahnya
+            self._extend_word(words.pop(0))
+            if words or chunk[-1].isspace():
+                self._flush_word()
+            else:
+                return
+        
+        # Kata terakhir mungkin berlanjut di chunk berikutnya
+        if words and not chunk[-1].isspace():
+            self._extend_word(words.pop())
+        
+        self._count_words(words)
+    
+    def _extend_word(self, part: str):
+        self._word_length += len(part)
+        if self.detailed and self._word_stored < self.MAX_WORD_LENGTH:
+            part = part[:self.MAX_WORD_LENGTH - self._word_stored]
+            self._word_parts.append(part)
+            self._word_stored += len(part)
+    
+    def _flush_word(self):
+        if not self._word_length:
+            return
+        self.words += 1
+        if self.detailed:
+            word = "".join(self._word_parts)
+            self._record_words([word], self._word_length, self._word_length, word)
+        self._word_parts = []
+        self._word_length = 0
+        self._word_stored = 0
+    
+    def _count_words(self, words):
+        self.words += len(words)
+        if not self.detailed or not words:
+            return
+        
+        longest = max(words, key=len)
+        self._record_words(words, sum(map(len, words)), len(longest), longest)
+    
+    def _record_words(self, words, total_length: int, longest_length: int, longest: str):
+        self.word_length_total += total_length
+        if longest_length > self._longest_length:
+            self._longest_length = longest_length
+            self.longest_word = longest
+        self.unique.update(words)
+    
+    def _feed_paragraphs(self, chunk: str):
+        text = self._paragraph_carry + chunk
+        stripped = text.rstrip("\n")
+        
+        # Newline di akhir bisa menjadi bagian dari pemisah "\n\n" di chunk
+        # berikutnya; run >= 2 newline setara dengan tepat 2
+        self._paragraph_carry = "\n" * min(len(text) - len(stripped), 2)
+        self._split_paragraphs(stripped)
+    
+    def _split_paragraphs(self, text: str):
+        for i, segment in enumerate(text.split("\n\n")):
+            if i > 0:
+                self.paragraphs += self._paragraph_open
+                self._paragraph_open = False
+            if segment and not segment.isspace():
+                self._paragraph_open = True
+    
+    def result(self) -> Dict:
+        if self._decoder is not None:
+            tail = self._decoder.decode(b"", final=True)
+            if tail:
+                self.feed(tail)
+        
+        self._flush_word()
+        
+        self._split_paragraphs(self._paragraph_carry)
+        self._paragraph_carry = ""
+        self.paragraphs += self._paragraph_open
+        self._paragraph_open = False
+        
+        stats = {
+            "characters": self.characters,
+            "characters_no_spaces": self.characters - self.spaces,
+            "words": self.words,
+            "sentences": self.sentences,
+            "lines": self.newlines + 1,
+            "paragraphs": self.paragraphs
+        }
+        
+        if self.detailed:
+            stats["average_word_length"] = (
+                self.word_length_total / self.words if self.words else 0
+            )
+            stats["unique_words"] = self.unique.count()
+            stats["longest_word"] = self.longest_word
+            if self.unique.estimated:
+                stats["unique_words_estimated"] = True
+        
+        return stats
 
 
 class TextAnalysisTool(BaseTool):
     """Tool untuk analisis teks"""
     
-    def __init__(self):
+    # Hasil hanya bergantung pada kwargs
+    cacheable = True
+    
+    DEFAULT_CHUNK_SIZE = 1 << 20
+    # Batas kata unik exact untuk input streaming sebelum beralih ke estimasi
+    STREAMING_UNIQUE_LIMIT = 100000
+    
+    def __init__(self, allowed_dirs: list = None):
         metadata = ToolMetadata(
             name="text_analysis",
-            description="Analyze text: count words, characters, sentences, lines, and provide statistics",
+            description="Analyze text: count words, characters, sentences, lines, and provide statistics. "
+                        "Large inputs can be streamed from a file path or an iterator of chunks",
             category="computation"
         )
         super().__init__(metadata)
         
+        # Security: restrict file input to allowed directories
+        self.allowed_dirs = allowed_dirs or [os.getcwd()]
+        
         self.add_parameter(ToolParameter(
-            "text", "string", "Text to analyze", required=True
+            "text", "string",
+            "Text to analyze (a bytes/memoryview buffer from another step is read without copying)",
+            required=False
+        ))
+        self.add_parameter(ToolParameter(
+            "path", "string", "Path of a text file to analyze in streaming mode",
+            required=False
         ))
         self.add_parameter(ToolParameter(
             "detailed", "boolean", "Include detailed statistics", 
             required=False, default=False
         ))
+        self.add_parameter(ToolParameter(
+            "chunks", "array",
+            "Streaming mode: iterable of str/bytes chunks (e.g. iter_chunks from file_operation)",
+            required=False
+        ))
+        self.add_parameter(ToolParameter(
+            "chunk_size", "integer", "Chunk size for streaming a path or buffer",
+            required=False
+        ))
     
     def validate_input(self, **kwargs) -> bool:
-        return bool(kwargs.get("text"))
+        path = kwargs.get("path")
+        if path:
+            abs_path = os.path.abspath(path)
+            return any(abs_path.startswith(allowed) for allowed in self.allowed_dirs)
+        
+        return bool(kwargs.get("text")) or kwargs.get("chunks") is not None
+    
+    def cache_key(self, **kwargs) -> Optional[str]:
+        # File bisa berubah dan iterator hanya bisa dibaca sekali
+        if kwargs.get("path") or kwargs.get("chunks") is not None:
+            return None
+        return super().cache_key(**kwargs)
     
     def execute(self, **kwargs) -> Dict:
-        text = kwargs["text"]
         detailed = kwargs.get("detailed", False)
         
-        # Basic statistics
-        stats = {
-            "characters": len(text),
-            "characters_no_spaces": len(text.replace(" ", "")),
-            "words": len(text.split()),
-            "sentences": text.count('.') + text.count('!') + text.count('?'),
-            "lines": len(text.split('\n')),
-            "paragraphs": len([p for p in text.split('\n\n') if p.strip()])
-        }
+        text = kwargs.get("text")
+        if kwargs.get("path") or kwargs.get("chunks") is not None:
+            stats = TextStatistics(detailed, unique_limit=self.STREAMING_UNIQUE_LIMIT)
+            chunks = (self._read_chunks(kwargs["path"], kwargs.get("chunk_size"))
+                      if kwargs.get("path") else kwargs["chunks"])
+        elif isinstance(text, (bytes, bytearray, memoryview)):
+            # Buffer (mis. mmap dari file_operation) dibaca per slice tanpa copy
+            stats = TextStatistics(detailed, unique_limit=self.STREAMING_UNIQUE_LIMIT)
+            chunks = self._buffer_chunks(text, kwargs.get("chunk_size"))
+        else:
+            stats = TextStatistics(detailed)
+            chunks = [kwargs["text"]]
         
-        if detailed:
-            words = text.split()
-            stats["average_word_length"] = (
-                sum(len(word) for word in words) / len(words) 
-                if words else 0
-            )
-            stats["unique_words"] = len(set(words))
-            stats["longest_word"] = max(words, key=len) if words else ""
+        for chunk in chunks:
+            stats.feed(chunk)
         
-        return stats
+        return stats.result()
+    
+    def _buffer_chunks(self, buffer, chunk_size: int = None) -> Iterator[memoryview]:
+        view = memoryview(buffer).cast("B")
+        chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+    
+    def _read_chunks(self, path: str, chunk_size: int = None) -> Iterator[str]:
+        """Baca file per chunk dengan memori konstan"""
+        chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
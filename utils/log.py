@@ -0,0 +1,123 @@
+"""
+Logging Pipeline
+File: utils/log.py
+"""
+
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+from config.settings import settings
+
+
+ROOT_LOGGER = "agentic"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler yang membuang record saat antrian penuh, tidak pernah blocking
+    
+    Berbeda dengan QueueHandler bawaan, prepare() tidak memformat record
+    (timestamp, exc_info) di thread caller; hanya msg % args yang
+    digabung supaya argumen mutable tidak berubah sebelum ditulis.
+    Formatting dilakukan handler milik QueueListener.
+    """
+    
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger di bawah namespace 'agentic' (mis. agentic.core.agent)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def setup_logging(force: bool = False) -> logging.Logger:
+    """Konfigurasi logging sesuai ENABLE_LOGGING, LOG_LEVEL dan LOG_DIR
+    
+    Caller hanya menyalin record ke antrian (lihat NonBlockingQueueHandler);
+    formatting ke console dan file dilakukan QueueListener di background
+    thread.
+    """
+    global _listener
+    
+    root = logging.getLogger(ROOT_LOGGER)
+    if _listener is not None and not force:
+        return root
+    
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.propagate = False
+    
+    if not settings.ENABLE_LOGGING:
+        # Level di atas CRITICAL: isEnabledFor() langsung False di hot path
+        root.setLevel(logging.CRITICAL + 1)
+        root.addHandler(logging.NullHandler())
+        return root
+    
+    root.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+    
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    handlers = [console]
+    
+    try:
+        settings.LOG_DIR.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            settings.LOG_DIR / "agentic.log",
+            maxBytes=10 * 1024 * 1024,
+            backupCount=5,
+            encoding="utf-8"
+        )
+        file_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s"
+        ))
+        handlers.append(file_handler)
+    except OSError as e:
+        console.handle(logging.makeLogRecord({
+            "msg": f"⚠️  Cannot write log file in {settings.LOG_DIR}: {e}",
+            "levelno": logging.WARNING,
+            "levelname": "WARNING"
+        }))
+    
+    log_queue: "queue.Queue" = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    
+    return root
+
+
+def shutdown_logging():
+    """Hentikan listener setelah semua record di antrian ditulis"""
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)